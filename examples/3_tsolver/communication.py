@@ -3,8 +3,6 @@ import time
 from operator import truediv
 from queue import PriorityQueue
 
-import numpy as np
-
 
 class BaseControlError(Exception):
     """inherited by all exceptions in this module"""
@@ -262,14 +260,11 @@ class Transmitter:
                 if command.action == "command_instruct":
                     inputdata = command.params
                 elif command.action == "command_retrieve":
-                    records = self.records
-                    if isinstance(records, np.ndarray):
-                        records = records.tolist()
                     outputdata = {
                         "t": self.t,
                         "endsignal": self.endsignal,
                         "paused": self.paused,
-                        "records": records,
+                        "records": self.records,
                     }  # start?
                     self.interface.request_without_reply(
                         "command_data", params=outputdata
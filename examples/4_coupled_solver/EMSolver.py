@@ -277,8 +277,7 @@ class EMsolver:
             if recinfo[0] == "SARvol":
                 record = self.SAR[
                     recinfo[1][0] : recinfo[1][2], recinfo[1][1] : recinfo[1][3]
-                ]
-                record = record.tolist()
+                ].copy()
                 self.transmitter.record_for_me(recindex, t, record)
             recindex, recinfo = self.transmitter.get_record_entry(t)
 
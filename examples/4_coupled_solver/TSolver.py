@@ -87,11 +87,10 @@ class Tsolver:
             recindex, (name, params) = entry
             if name == "Tpoint":
                 record = self.T[params[0], params[1]]
-                record = record.tolist()
             elif name == "Tvol":
                 # import pdb; pdb.set_trace()
-                record = self.T[params[0] : params[2], params[1] : params[3]]
-                record = record.tolist()
+                # NOTE: copied, the field keeps changing until the record is sent
+                record = self.T[params[0] : params[2], params[1] : params[3]].copy()
             else:
                 print("Record key not understood: " + str(name))
             self.transmitter.records[recindex].append((t, record))
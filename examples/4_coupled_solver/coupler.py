@@ -53,10 +53,8 @@ class EM_T_coupler:
             # import pdb; pdb.set_trace()
             SAR = np.asarray(self.transmittersateliteEM.get(recindexEM)[0][1])
             T = np.asarray(self.transmittersateliteT.get(recindexT)[0][1])
-            Tlist = T.tolist()
-            SARlist = SAR.tolist()
-            self.transmittersateliteEM.setnow(self.EMsetparam_key, Tlist)
-            self.transmittersateliteT.setnow(self.Tsetparam_key, SARlist)
+            self.transmittersateliteEM.setnow(self.EMsetparam_key, T)
+            self.transmittersateliteT.setnow(self.Tsetparam_key, SAR)
             self.Tstored.append(T)
             self.EMstored.append(SAR)
             nexttime = nexttime + self.coupling_interval
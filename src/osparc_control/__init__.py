@@ -1,4 +1,5 @@
 """Osparc Control."""
+from .async_core import AsyncPairedTransmitter
 from .core import PairedTransmitter
 from .models import CommandManifest
 from .models import CommandParameter
@@ -6,6 +7,7 @@ from .models import CommandRequest
 from .models import CommandType
 
 __all__ = [
+    "AsyncPairedTransmitter",
     "PairedTransmitter",
     "CommandManifest",
     "CommandParameter",
@@ -0,0 +1,277 @@
+import asyncio
+from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Type
+
+from pydantic import validate_arguments
+from pydantic import ValidationError
+
+from .core import _generate_request_id
+from .core import _get_refusal_reason
+from .core import _map_exposed_commands
+from .core import DEFAULT_LISTEN_PORT
+from .core import WAIT_FOR_RECEIVED_S
+from .errors import CommandConfirmationTimeoutError
+from .errors import CommandNotAcceptedError
+from .models import CommandBase
+from .models import CommandManifest
+from .models import CommandReceived
+from .models import CommandReply
+from .models import CommandRequest
+from .models import CommandType
+from .models import decode_message_frames
+from .models import Message
+from .models import unpack_batch
+from .serialization import Buffer
+from .transport.base_transport import BaseAsyncTransport
+from .transport.zeromq import AsyncZeroMQTransport
+
+
+def _get_async_transport(
+    listen_port: int, remote_host: str, remote_port: int
+) -> BaseAsyncTransport:
+    return AsyncZeroMQTransport(
+        listen_port=listen_port, remote_host=remote_host, remote_port=remote_port
+    )
+
+
+class AsyncPairedTransmitter:
+    """
+    asyncio version of `PairedTransmitter`, all the work is done by the
+    event loop it is started from. Can be paired with a `PairedTransmitter`.
+    """
+
+    @validate_arguments
+    def __init__(
+        self,
+        remote_host: str,
+        *,
+        exposed_commands: List[CommandManifest],
+        remote_port: int = DEFAULT_LISTEN_PORT,
+        listen_port: int = DEFAULT_LISTEN_PORT,
+    ) -> None:
+        self._transport: BaseAsyncTransport = _get_async_transport(
+            remote_host=remote_host, remote_port=remote_port, listen_port=listen_port
+        )
+
+        self._exposed_commands: Dict[str, CommandManifest] = _map_exposed_commands(
+            exposed_commands
+        )
+
+        # completed when remote confirms the request with the same request_id
+        self._pending_confirmations: Dict[str, asyncio.Future[CommandReceived]] = {}
+        # completed with the payload of the reply to the request_id
+        self._pending_replies: Dict[str, asyncio.Future[Any]] = {}
+        # NOTE: `None` signals iterators over incoming requests to stop
+        self._incoming_requests: Optional[asyncio.Queue[Optional[CommandRequest]]] = (
+            None
+        )
+
+        # dispatches decoded messages by their type
+        self._message_handlers: Dict[
+            Type[CommandBase], Callable[[Any], Awaitable[None]]
+        ] = {
+            CommandRequest: self._handle_command_request,
+            CommandReceived: self._handle_command_received,
+            CommandReply: self._handle_command_reply,
+        }
+
+        self._receiver_task: Optional[asyncio.Future[None]] = None
+
+    async def __aenter__(self) -> "AsyncPairedTransmitter":
+        await self.start_background_sync()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop_background_sync()
+
+    async def _send(self, message: Message) -> None:
+        if not self._transport.supports_frames:
+            await self._transport.send_bytes(message.to_bytes())
+            return
+
+        frames = message.to_frames()
+        if len(frames) == 1:
+            await self._transport.send_bytes(bytes(frames[0]))
+        else:
+            await self._transport.send_frames(frames)
+
+    async def _handle_frames(self, frames: Sequence[Buffer]) -> None:
+        try:
+            message: Optional[Message] = decode_message_frames(frames)
+        except ValidationError:
+            return
+        if message is None:
+            return  # not a message this side can understand
+
+        await self._message_handlers[type(message)](message)
+
+    async def _handle_command_request(self, command_request: CommandRequest) -> None:
+        error_message: Optional[str] = _get_refusal_reason(
+            self._exposed_commands, command_request
+        )
+        await self._send(
+            CommandReceived(
+                request_id=command_request.request_id,
+                accepted=error_message is None,
+                error_message=error_message,
+            )
+        )
+
+        if error_message is None:
+            assert self._incoming_requests  # noqa: S101
+            self._incoming_requests.put_nowait(command_request)
+
+    async def _handle_command_received(self, command_received: CommandReceived) -> None:
+        confirmation: Optional[asyncio.Future[CommandReceived]] = (
+            self._pending_confirmations.pop(command_received.request_id, None)
+        )
+        if confirmation is None or confirmation.done():
+            return  # caller stopped waiting for the confirmation
+
+        confirmation.set_result(command_received)
+
+    async def _handle_command_reply(self, command_reply: CommandReply) -> None:
+        reply: Optional[asyncio.Future[Any]] = self._pending_replies.pop(
+            command_reply.reply_id, None
+        )
+        if reply is None or reply.done():
+            return  # caller stopped waiting for the reply
+
+        reply.set_result(command_reply.payload)
+
+    async def _receiver_worker(self) -> None:
+        while True:
+            frames: List[Buffer] = await self._transport.receive_frames()
+            if len(frames) > 1:
+                await self._handle_frames(frames)
+                continue
+
+            for frame in unpack_batch(bytes(frames[0])):
+                await self._handle_frames([frame])
+
+    async def _enqueue_call(
+        self,
+        action: str,
+        params: Optional[Dict[str, Any]],
+        expected_command_type: CommandType,
+    ) -> "asyncio.Future[Any]":
+        """
+        sends the call to remote and waits for it to be accepted,
+        returns the future completed by the reply
+        """
+        request = CommandRequest(
+            request_id=_generate_request_id(),
+            action=action,
+            params={} if params is None else params,
+            command_type=expected_command_type,
+        )
+
+        loop = asyncio.get_event_loop()
+        confirmation: asyncio.Future[CommandReceived] = loop.create_future()
+        self._pending_confirmations[request.request_id] = confirmation
+        reply: asyncio.Future[Any] = loop.create_future()
+        if expected_command_type != CommandType.WITHOUT_REPLY:
+            # registered before sending, the reply might arrive at any point
+            self._pending_replies[request.request_id] = reply
+
+        async def _send_and_confirm() -> CommandReceived:
+            # NOTE: sending also waits, until a remote is connected
+            await self._send(request)
+            return await confirmation
+
+        try:
+            command_received: CommandReceived = await asyncio.wait_for(
+                _send_and_confirm(), timeout=WAIT_FOR_RECEIVED_S
+            )
+        except asyncio.TimeoutError:
+            self._pending_replies.pop(request.request_id, None)
+            raise CommandConfirmationTimeoutError() from None
+        finally:
+            self._pending_confirmations.pop(request.request_id, None)
+
+        if not command_received.accepted:
+            self._pending_replies.pop(request.request_id, None)
+            raise CommandNotAcceptedError(command_received.error_message)
+
+        return reply
+
+    async def start_background_sync(self) -> None:
+        """starts the task receiving data in the running event loop"""
+        self._transport.init()
+        self._incoming_requests = asyncio.Queue()
+        self._receiver_task = asyncio.ensure_future(self._receiver_worker())
+
+    async def stop_background_sync(self) -> None:
+        """stops the task receiving data"""
+        assert self._receiver_task  # noqa: S101
+        self._receiver_task.cancel()
+        try:
+            await self._receiver_task
+        except asyncio.CancelledError:
+            pass
+
+        assert self._incoming_requests  # noqa: S101
+        self._incoming_requests.put_nowait(None)
+
+        self._transport.cleanup()
+
+    async def request_without_reply(
+        self, action: str, params: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """No reply will be provided by remote side for this command"""
+        await self._enqueue_call(action, params, CommandType.WITHOUT_REPLY)
+
+    async def request_with_delayed_reply(
+        self, action: str, params: Optional[Dict[str, Any]] = None
+    ) -> Awaitable[Any]:
+        """
+        returns once remote accepted the request, awaiting the returned
+        awaitable provides the reply
+        """
+        return await self._enqueue_call(action, params, CommandType.WITH_DELAYED_REPLY)
+
+    async def request_with_immediate_reply(
+        self,
+        action: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: float,
+    ) -> Optional[Any]:
+        """
+        Requests and awaits for the response from remote.
+        A timeout for this function is required. If the timeout is reached `None` will
+        be returned.
+        """
+        reply: asyncio.Future[Any] = await self._enqueue_call(
+            action, params, CommandType.WITH_IMMEDIATE_REPLY
+        )
+
+        try:
+            return await asyncio.wait_for(reply, timeout=timeout)
+        except asyncio.TimeoutError:
+            # NOTE: cancelled by wait_for, the reply handler will skip it
+            return None
+
+    async def incoming_requests(self) -> AsyncIterator[CommandRequest]:
+        """
+        Yields CommandRequests as they arrive, until the transmitter is stopped
+        """
+        assert self._incoming_requests  # noqa: S101
+        while True:
+            command_request = await self._incoming_requests.get()
+            if command_request is None:
+                # let other iterators stop as well
+                self._incoming_requests.put_nowait(None)
+                return
+            yield command_request
+
+    async def reply_to_command(self, request_id: str, payload: Any) -> None:
+        """provide the reply back to a command"""
+        await self._send(CommandReply(reply_id=request_id, payload=payload))
@@ -1,48 +1,60 @@
 from collections import deque
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from queue import Empty
 from queue import Queue
 from threading import Thread
-from time import sleep
+from time import monotonic
 from typing import Any
+from typing import Callable
 from typing import Deque
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Tuple
-from typing import Union
+from typing import Type
 from uuid import getnode
 from uuid import UUID
 from uuid import uuid4
 
 from pydantic import validate_arguments
 from pydantic import ValidationError
-from tenacity import Retrying
-from tenacity.stop import stop_after_delay
-from tenacity.wait import wait_fixed
 
 from .errors import CommandConfirmationTimeoutError
 from .errors import CommandNotAcceptedError
-from .errors import NoReplyError
+from .models import CommandBase
 from .models import CommandManifest
 from .models import CommandReceived
 from .models import CommandReply
 from .models import CommandRequest
 from .models import CommandType
+from .models import decode_message_frames
+from .models import Handshake
+from .models import Message
+from .models import pack_batch
 from .models import RequestsTracker
+from .models import RequestsTrackerStats
+from .models import SCHEMA_FINGERPRINT
 from .models import TrackedRequest
+from .models import unpack_batch
+from .serialization import Buffer
 from .transport.base_transport import SenderReceiverPair
 from osparc_control.transport.zeromq import ZeroMQTransport
 
 _MINUTE: float = 60.0
 
-WAIT_FOR_MESSAGES: float = 0.01
-WAIT_BETWEEN_CHECKS: float = 0.1
+# upper bound for the receiver to block while waiting for messages,
+# incoming messages and stopping the workers wake it up earlier
+WAIT_FOR_MESSAGES: float = 1.0
 # NOTE: this effectively limits the time between when
 # the two remote sides can start to communicate
 WAIT_FOR_RECEIVED_S: float = 1 * _MINUTE
 
 DEFAULT_LISTEN_PORT: int = 7426
 
+DEFAULT_BATCH_MAX_BYTES: int = 1024 * 1024
+
 UNIQUE_HARDWARE_ID: int = getnode()
 SESSION_ID: UUID = uuid4()
 
@@ -63,6 +75,58 @@ def _get_sender_receiver_pair(
     return SenderReceiverPair(sender=sender, receiver=receiver)
 
 
+def _map_exposed_commands(
+    exposed_commands: List[CommandManifest],
+) -> Dict[str, CommandManifest]:
+    """map action to the final version of the manifest"""
+
+    def _update_remapped_params(manifest: CommandManifest) -> CommandManifest:
+        manifest._params_names_set = {x.name for x in manifest.params}
+        return manifest
+
+    mapped_commands: Dict[str, CommandManifest] = {
+        x.action: _update_remapped_params(x) for x in exposed_commands
+    }
+    if len(mapped_commands) != len(exposed_commands):
+        raise ValueError(
+            f"Provided exposed_commands={exposed_commands} "
+            "contains CommandManifest with same action name."
+        )
+    return mapped_commands
+
+
+def _get_refusal_reason(
+    exposed_commands: Dict[str, CommandManifest], command_request: CommandRequest
+) -> Optional[str]:
+    """returns why the request cannot be accepted, None if it can be accepted"""
+    # check if command exists
+    if command_request.action not in exposed_commands:
+        return (
+            f"No registered command found for action={command_request.action}. "
+            f"Supported actions {list(exposed_commands.keys())}"
+        )
+
+    manifest = exposed_commands[command_request.action]
+
+    # check command_type matches the one declared in the manifest
+    if command_request.command_type != manifest.command_type:
+        return (
+            f"Incoming request command_type {command_request.command_type} "
+            f"do not match manifest's command_type {manifest.command_type} "
+            f"for command {command_request.action}"
+        )
+
+    # check if provided parametes match manifest
+    incoming_params_set = set(command_request.params.keys())
+    if incoming_params_set != manifest._params_names_set:
+        return (
+            f"Incoming request params {command_request.params} do not match "
+            f"manifest's params {manifest.params}"
+        )
+
+    return None
+
+
 class PairedTransmitter:
     @validate_arguments
     def __init__(
@@ -72,34 +136,61 @@ class PairedTransmitter:
         exposed_commands: List[CommandManifest],
         remote_port: int = DEFAULT_LISTEN_PORT,
         listen_port: int = DEFAULT_LISTEN_PORT,
+        request_tracker_max_size: Optional[int] = None,
+        request_tracker_ttl: Optional[float] = None,
+        batch_max_count: int = 1,
+        batch_max_bytes: int = DEFAULT_BATCH_MAX_BYTES,
+        batch_linger: float = 0.0,
+        validate_messages: bool = False,
     ) -> None:
+        """
+        Requests waiting for a reply are tracked until the reply is consumed.
+        Use `request_tracker_max_size` and `request_tracker_ttl` to also evict
+        the ones never consumed.
+
+        Setting `batch_max_count` above 1 sends the messages accumulated for
+        delivery in batches of up to `batch_max_count` messages or
+        `batch_max_bytes`, waiting at most `batch_linger` seconds for a batch
+        to fill. Remote must be able to unpack batches.
+
+        Messages from a remote which completed the handshake with the same
+        message schema are not validated, unless `validate_messages` is set,
+        useful when debugging.
+        """
+        if batch_max_count < 1:
+            raise ValueError(f"batch_max_count={batch_max_count} must be at least 1")
+        self._batch_max_count: int = batch_max_count
+        self._batch_max_bytes: int = batch_max_bytes
+        self._batch_linger: float = batch_linger
+        self._validate_messages: bool = validate_messages
+        # set once remote completes the handshake using the same schema
+        self._trusted_remote: bool = False
 
         self._sender_receiver_pair: SenderReceiverPair = _get_sender_receiver_pair(
             remote_host=remote_host, remote_port=remote_port, listen_port=listen_port
         )
 
-        def _update_remapped_params(manifest: CommandManifest) -> CommandManifest:
-            manifest._params_names_set = {x.name for x in manifest.params}
-            return manifest
-
-        # map action to the final version of the manifest
-        self._exposed_commands: Dict[str, CommandManifest] = {
-            x.action: _update_remapped_params(x) for x in exposed_commands
-        }
-        if len(self._exposed_commands) != len(exposed_commands):
-            raise ValueError(
-                f"Provided exposed_commands={exposed_commands} "
-                "contains CommandManifest with same action name."
-            )
+        self._exposed_commands: Dict[str, CommandManifest] = _map_exposed_commands(
+            exposed_commands
+        )
 
-        self._request_tracker: RequestsTracker = {}
+        self._request_tracker: RequestsTracker = RequestsTracker(
+            max_size=request_tracker_max_size, ttl=request_tracker_ttl
+        )
         # NOTE: deque is thread safe only when used with appends and pops
         self._incoming_request_tracker: Deque[CommandRequest] = deque()
 
-        self._out_queue: Queue[
-            Optional[Union[CommandRequest, CommandReceived, CommandReply]]
-        ] = Queue()
-        self._incoming_command_queue: Queue[Optional[CommandReceived]] = Queue()
+        self._out_queue: Queue[Optional[Message]] = Queue()
+        # completed when remote confirms the request with the same request_id
+        self._pending_confirmations: Dict[str, Future[CommandReceived]] = {}
+
+        # dispatches decoded messages by their type
+        self._message_handlers: Dict[Type[CommandBase], Callable[[Any], None]] = {
+            CommandRequest: self._handle_command_request,
+            CommandReceived: self._handle_command_received,
+            CommandReply: self._handle_command_reply,
+            Handshake: self._handle_handshake,
+        }
 
         # sending and receiving threads
         self._sender_thread: Thread = Thread(target=self._sender_worker, daemon=True)
@@ -116,131 +207,157 @@ class PairedTransmitter:
         self.stop_background_sync()
 
     def _sender_worker(self) -> None:
+        handshake_sent = False
         with self._sender_receiver_pair:
             while self._continue:
-                message: Optional[
-                    Union[CommandRequest, CommandReceived, CommandReply]
-                ] = self._out_queue.get()
+                message: Optional[Message] = self._out_queue.get()
                 if message is None:
                     # exit worker
                     break
 
-                # send message
-                self._sender_receiver_pair.send_bytes(message.to_bytes())
+                if not handshake_sent:
+                    # NOTE: sent with the first message, remote might not exist
+                    # before, remote replies with its own handshake
+                    self._send_frames(
+                        self._to_frames(
+                            Handshake(
+                                schema_fingerprint=SCHEMA_FINGERPRINT,
+                                reply_requested=True,
+                            )
+                        )
+                    )
+                    handshake_sent = True
+
+                message_frames = self._to_frames(message)
+                if self._batch_max_count == 1 or len(message_frames) > 1:
+                    # send message, out of band buffers are never batched
+                    self._send_frames(message_frames)
+                    continue
+
+                frames, stop_requested = self._collect_batch(bytes(message_frames[0]))
+                self._sender_receiver_pair.send_bytes(
+                    frames[0] if len(frames) == 1 else pack_batch(frames)
+                )
+                if stop_requested:
+                    break
 
-    def _handle_command_request(self, response: bytes) -> None:
-        command_request: Optional[CommandRequest] = CommandRequest.from_bytes(response)
-        if command_request is None:
-            return  # pragma: no cover
+    def _to_frames(self, message: Message) -> List[Buffer]:
+        if self._sender_receiver_pair.supports_frames:
+            return message.to_frames()
+        return [message.to_bytes()]
 
-        def _refuse_and_return(error_message: str) -> None:
-            self._out_queue.put(
-                CommandReceived(
-                    request_id=command_request.request_id,  # type: ignore
-                    accepted=False,
-                    error_message=error_message,
-                )
-            )
-            return
+    def _send_frames(self, frames: List[Buffer]) -> None:
+        if len(frames) == 1:
+            self._sender_receiver_pair.send_bytes(bytes(frames[0]))
+        else:
+            self._sender_receiver_pair.send_frames(frames)
 
-        # check if command exists
-        if command_request.action not in self._exposed_commands:
-            error_message = (
-                f"No registered command found for action={command_request.action}. "
-                f"Supported actions {list(self._exposed_commands.keys())}"
-            )
-            _refuse_and_return(error_message)
+    def _collect_batch(self, first_frame: bytes) -> Tuple[List[bytes], bool]:
+        """
+        returns the frames of the messages waiting for delivery and if
+        the worker was requested to stop while collecting them
+        NOTE: batched messages carry their buffers in band
+        """
+        frames: List[bytes] = [first_frame]
+        batch_size: int = len(first_frame)
+        deadline: float = monotonic() + self._batch_linger
+
+        while (
+            len(frames) < self._batch_max_count and batch_size < self._batch_max_bytes
+        ):
+            remaining_linger = deadline - monotonic()
+            try:
+                message: Optional[Message] = self._out_queue.get(
+                    block=remaining_linger > 0, timeout=max(remaining_linger, 0)
+                )
+            except Empty:
+                break
+            if message is None:
+                return frames, True
 
-        manifest = self._exposed_commands[command_request.action]
+            frame = message.to_bytes()
+            frames.append(frame)
+            batch_size += len(frame)
 
-        # check command_type matches the one declared in the manifest
-        if command_request.command_type != manifest.command_type:
-            error_message = (
-                f"Incoming request command_type {command_request.command_type} "
-                f"do not match manifest's command_type {manifest.command_type} "
-                f"for command {command_request.action}"
-            )
-            _refuse_and_return(error_message)
-
-        # check if provided parametes match manifest
-        incoming_params_set = set(command_request.params.keys())
-        if incoming_params_set != manifest._params_names_set:
-            error_message = (
-                f"Incoming request params {command_request.params} do not match "
-                f"manifest's params {manifest.params}"
-            )
-            _refuse_and_return(error_message)
+        return frames, False
 
-        # accept command
+    def _handle_command_request(self, command_request: CommandRequest) -> None:
+        error_message: Optional[str] = _get_refusal_reason(
+            self._exposed_commands, command_request
+        )
         self._out_queue.put(
             CommandReceived(
                 request_id=command_request.request_id,
-                accepted=True,
-                error_message=None,
+                accepted=error_message is None,
+                error_message=error_message,
             )
         )
 
-        self._incoming_request_tracker.append(command_request)
+        if error_message is None:
+            self._incoming_request_tracker.append(command_request)
 
-    def _handle_command_reply(self, response: bytes) -> None:
-        command_reply: Optional[CommandReply] = CommandReply.from_bytes(response)
-        assert command_reply  # noqa: S101
+    def _handle_command_reply(self, command_reply: CommandReply) -> None:
+        tracked_request: Optional[TrackedRequest] = self._request_tracker.get(
+            command_reply.reply_id
+        )
+        if tracked_request is None:
+            return  # request was evicted or caller stopped waiting for the reply
 
-        tracked_request: TrackedRequest = self._request_tracker[command_reply.reply_id]
-        tracked_request.reply = command_reply
+        tracked_request.set_reply(command_reply)
 
-    def _handle_command_received(self, response: bytes) -> None:
-        command_received: Optional[CommandReceived] = CommandReceived.from_bytes(
-            response
+    def _handle_command_received(self, command_received: CommandReceived) -> None:
+        confirmation: Optional[Future[CommandReceived]] = (
+            self._pending_confirmations.pop(command_received.request_id, None)
         )
-        assert command_received  # noqa: S101
+        if confirmation is None:
+            return  # caller stopped waiting for the confirmation
+
+        confirmation.set_result(command_received)
 
-        self._incoming_command_queue.put_nowait(command_received)
+    def _handle_handshake(self, handshake: Handshake) -> None:
+        self._trusted_remote = handshake.schema_fingerprint == SCHEMA_FINGERPRINT
+        if handshake.reply_requested:
+            self._out_queue.put(
+                Handshake(schema_fingerprint=SCHEMA_FINGERPRINT, reply_requested=False)
+            )
 
     def _receiver_worker(self) -> None:
         self._sender_receiver_pair.receiver_init()
 
         while self._continue:
-            sleep(WAIT_FOR_MESSAGES)
-
-            response: Optional[bytes] = self._sender_receiver_pair.receive_bytes()
-            if response is None:
-                # no messages available
+            if not self._sender_receiver_pair.wait_for_messages(WAIT_FOR_MESSAGES):
                 continue
 
-            # NOTE: pydantic does not support polymorphism
-            # SEE https://github.com/samuelcolvin/pydantic/issues/503
-            # below try catch pattern is how to deal with it
-
-            # case CommandReceived
-            try:
-                self._handle_command_received(response)
-                continue
-            except ValidationError:
-                pass
+            # drain all messages which arrived since last wakeup
+            frames: Optional[List[Buffer]] = self._sender_receiver_pair.receive_frames()
+            while frames is not None:
+                if len(frames) > 1:
+                    self._handle_response(frames)
+                else:
+                    for frame in unpack_batch(bytes(frames[0])):
+                        self._handle_response([frame])
+                frames = self._sender_receiver_pair.receive_frames()
 
-            # case CommandRequest
-            try:
-                self._handle_command_request(response)
-                continue
-            except ValidationError:
-                pass
+        self._sender_receiver_pair.receiver_cleanup()
 
-            # case CommandReply
-            try:
-                self._handle_command_reply(response)
-                continue
-            except ValidationError:
-                pass
+    def _handle_response(self, frames: Sequence[Buffer]) -> None:
+        try:
+            message: Optional[Message] = decode_message_frames(
+                frames, trusted=self._trusted_remote and not self._validate_messages
+            )
+        except ValidationError:
+            return
+        if message is None:
+            return  # not a message this side can understand
 
-        self._sender_receiver_pair.receiver_cleanup()
+        self._message_handlers[type(message)](message)
 
     def _enqueue_call(
         self,
         action: str,
         params: Optional[Dict[str, Any]],
         expected_command_type: CommandType,
-    ) -> CommandRequest:
+    ) -> TrackedRequest:
         """validates and enqueues the call for delivery to remote"""
         request = CommandRequest(
             request_id=_generate_request_id(),
@@ -249,9 +366,11 @@ class PairedTransmitter:
             command_type=expected_command_type,
         )
 
-        self._request_tracker[request.request_id] = TrackedRequest(
-            request=request, reply=None
-        )
+        tracked_request = TrackedRequest(request=request, reply=None)
+        self._request_tracker.add(tracked_request)
+
+        confirmation: Future[CommandReceived] = Future()
+        self._pending_confirmations[request.request_id] = confirmation
 
         self._out_queue.put(request)
 
@@ -261,24 +380,25 @@ class PairedTransmitter:
         # an error will also be raised if the command was
         # unexpected (did not validate agains a
         # CommandManifest entry)
-        command_received: Optional[CommandReceived] = None
         try:
-            for attempt in Retrying(
-                stop=stop_after_delay(WAIT_FOR_RECEIVED_S),
-                wait=wait_fixed(WAIT_BETWEEN_CHECKS),
-                retry_error_cls=Empty,  # type: ignore
-            ):
-                with attempt:
-                    command_received = self._incoming_command_queue.get(block=False)
-        except Empty:
+            command_received: CommandReceived = confirmation.result(
+                timeout=WAIT_FOR_RECEIVED_S
+            )
+        except FutureTimeoutError:
+            self._request_tracker.pop(request.request_id)
             raise CommandConfirmationTimeoutError() from None
-
-        assert command_received  # noqa: S101
+        finally:
+            self._pending_confirmations.pop(request.request_id, None)
 
         if not command_received.accepted:
+            self._request_tracker.pop(request.request_id)
             raise CommandNotAcceptedError(command_received.error_message)
 
-        return request
+        if expected_command_type == CommandType.WITHOUT_REPLY:
+            # nothing else to wait for
+            self._request_tracker.pop(request.request_id)
+
+        return tracked_request
 
     def start_background_sync(self) -> None:
         """starts workers handling data transfer"""
@@ -292,6 +412,7 @@ class PairedTransmitter:
 
         # stopping workers
         self._out_queue.put(None)
+        self._sender_receiver_pair.wakeup_receiver()
 
         self._sender_thread.join()
         self._receiver_thread.join()
@@ -309,8 +430,10 @@ class PairedTransmitter:
         returns a `request_id` to be used with `check_for_reply` to monitor
         if a reply to the request was returned.
         """
-        request = self._enqueue_call(action, params, CommandType.WITH_DELAYED_REPLY)
-        return request.request_id
+        tracked_request = self._enqueue_call(
+            action, params, CommandType.WITH_DELAYED_REPLY
+        )
+        return tracked_request.request.request_id
 
     def check_for_reply(self, request_id: str) -> Tuple[bool, Optional[Any]]:
         """
@@ -320,12 +443,15 @@ class PairedTransmitter:
         returns a tuple where:
         - first entry is True if the reply to the request was returned
         - second element is the actual returned value of the reply
+
+        NOTE: once returned the reply stops being tracked, following calls
+        with the same `request_id` will return `(False, None)`
         """
         tracked_request: Optional[TrackedRequest] = self._request_tracker.get(
-            request_id, None
+            request_id
         )
         if tracked_request is None:
-            return False, None  # pragma: no cover
+            return False, None
         # check for the correct type of request
         if tracked_request.request.command_type not in {
             CommandType.WITH_IMMEDIATE_REPLY,
@@ -340,6 +466,7 @@ class PairedTransmitter:
         if tracked_request.reply is None:
             return False, None
 
+        self._request_tracker.pop(request_id)
         return True, tracked_request.reply.payload
 
     def request_with_immediate_reply(
@@ -354,24 +481,22 @@ class PairedTransmitter:
         A timeout for this function is required. If the timeout is reached `None` will
         be returned.
         """
-        request = self._enqueue_call(action, params, CommandType.WITH_IMMEDIATE_REPLY)
+        tracked_request = self._enqueue_call(
+            action, params, CommandType.WITH_IMMEDIATE_REPLY
+        )
 
-        result: Optional[Any] = None
+        # woken up as soon as the reply is received
+        reply_received = tracked_request.wait_for_reply(timeout)
+        self._request_tracker.pop(tracked_request.request.request_id)
+        if not reply_received:
+            return None
 
-        try:
-            for attempt in Retrying(
-                stop=stop_after_delay(timeout),
-                wait=wait_fixed(WAIT_BETWEEN_CHECKS),
-                retry_error_cls=NoReplyError,  # type: ignore
-            ):
-                with attempt:
-                    reply_received, result = self.check_for_reply(request.request_id)
-                    if not reply_received:
-                        raise NoReplyError()
-        except NoReplyError:
-            pass
+        assert tracked_request.reply  # noqa: S101
+        return tracked_request.reply.payload
 
-        return result
+    def get_request_tracker_stats(self) -> RequestsTrackerStats:
+        """counts of requests waiting for a reply and of evicted ones"""
+        return self._request_tracker.get_stats()
 
     def get_incoming_requests(self) -> List[CommandRequest]:
         """
@@ -1,25 +1,91 @@
+import hashlib
+import json
+from collections import OrderedDict
 from enum import Enum
+from enum import IntEnum
+from threading import Event
+from threading import Lock
+from time import monotonic
 from typing import Any
+from typing import Callable
+from typing import ClassVar
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Sequence
 from typing import Set
+from typing import Tuple
+from typing import Type
+from typing import Union
 
-import umsgpack  # type: ignore
 from pydantic import BaseModel
 from pydantic import Extra
 from pydantic import Field
 from pydantic import PrivateAttr
 from pydantic import validator
+from pydantic import ValidationError
+
+from .serialization import Buffer
+from .serialization import packb
+from .serialization import packb_frames
+from .serialization import unpackb
+from .serialization import unpackb_frames
+
+# NOTE: 0xC1 is never used by msgpack, frames starting with it
+# carry an envelope header, otherwise they are legacy untagged frames
+ENVELOPE_MARKER: int = 0xC1
+ENVELOPE_VERSION: int = 1
+# marker, version, message kind
+ENVELOPE_HEADER_SIZE: int = 3
+
+
+class MessageKind(IntEnum):
+    COMMAND_REQUEST = 1
+    COMMAND_RECEIVED = 2
+    COMMAND_REPLY = 3
+    # carries multiple frames, each containing a message
+    BATCH = 4
+    HANDSHAKE = 5
+
+
+def _has_envelope(raw: bytes) -> bool:
+    return len(raw) >= ENVELOPE_HEADER_SIZE and raw[0] == ENVELOPE_MARKER
 
 
 class CommandBase(BaseModel):
+    # written in the envelope header, used to decode without guessing the type
+    message_kind: ClassVar[MessageKind]
+
+    def _envelope_header(self) -> bytes:
+        return bytes((ENVELOPE_MARKER, ENVELOPE_VERSION, self.message_kind))
+
+    def _pack(self, pack: Callable[[Any], Any]) -> Any:
+        # NOTE: fields are packed as they are, avoiding the copy made by
+        # `dict()`, which is only needed to convert nested pydantic models
+        try:
+            return pack(self.__dict__)
+        except TypeError:
+            return pack(self.dict())
+
     def to_bytes(self) -> bytes:
-        return umsgpack.packb(self.dict())  # type: ignore
+        packed: bytes = self._pack(packb)
+        return self._envelope_header() + packed
+
+    def to_frames(self) -> List[Buffer]:
+        """
+        Like `to_bytes`, but large binary buffers are returned as separate
+        frames following the first one, for transports supporting multipart
+        messages. Decode them with `decode_message_frames`.
+        """
+        frames: List[Buffer] = self._pack(packb_frames)
+        frames[0] = self._envelope_header() + frames[0]
+        return frames
 
     @classmethod
     def from_bytes(cls, raw: bytes) -> Optional[Any]:
-        return cls.parse_obj(umsgpack.unpackb(raw))
+        if _has_envelope(raw):
+            raw = raw[ENVELOPE_HEADER_SIZE:]
+        return cls.parse_obj(unpackb(raw))
 
     class Config:
         extra = Extra.allow
@@ -76,6 +142,8 @@ class CommandManifest(BaseModel):
 
 
 class CommandRequest(CommandBase):
+    message_kind: ClassVar[MessageKind] = MessageKind.COMMAND_REQUEST
+
     request_id: str = Field(..., description="unique identifier")
     action: str = Field(..., description="name of the action to be triggered on remote")
     params: Dict[str, Any] = Field({}, description="requested parameters by the user")
@@ -85,6 +153,8 @@ class CommandRequest(CommandBase):
 
 
 class CommandReceived(CommandBase):
+    message_kind: ClassVar[MessageKind] = MessageKind.COMMAND_RECEIVED
+
     request_id: str = Field(..., description="unique identifier from request")
     accepted: bool = Field(
         ..., description="True if command is correctly formatted otherwise False"
@@ -111,15 +181,221 @@ class CommandReceived(CommandBase):
 
 
 class CommandReply(CommandBase):
+    message_kind: ClassVar[MessageKind] = MessageKind.COMMAND_REPLY
+
     reply_id: str = Field(..., description="unique identifier from request")
     payload: Any = Field(..., description="user defined value for the command")
 
 
+class Handshake(CommandBase):
+    """
+    Exchanged when starting, messages from a peer with the same
+    `schema_fingerprint` can be decoded without validation
+    """
+
+    message_kind: ClassVar[MessageKind] = MessageKind.HANDSHAKE
+
+    schema_fingerprint: str = Field(
+        ..., description="identifies the schema of the messages used by the sender"
+    )
+    reply_requested: bool = Field(
+        ..., description="True if remote must reply with its own handshake"
+    )
+
+
+Message = Union[CommandRequest, CommandReceived, CommandReply, Handshake]
+
+_MESSAGE_CLASSES: Dict[int, Type[CommandBase]] = {
+    x.message_kind: x
+    for x in (CommandRequest, CommandReceived, CommandReply, Handshake)
+}
+# NOTE: order matters, same order used before envelopes were introduced
+_LEGACY_MESSAGE_CLASSES: List[Type[CommandBase]] = [
+    CommandReceived,
+    CommandRequest,
+    CommandReply,
+]
+
+
+def _get_schema_fingerprint() -> str:
+    schemas = [
+        x.schema() for x in (CommandRequest, CommandReceived, CommandReply)
+    ]
+    serialized_schemas = json.dumps([ENVELOPE_VERSION, schemas], sort_keys=True)
+    return hashlib.sha256(serialized_schemas.encode()).hexdigest()
+
+
+SCHEMA_FINGERPRINT: str = _get_schema_fingerprint()
+
+
+def _construct_command_request(data: Dict[str, Any]) -> CommandRequest:
+    data["command_type"] = CommandType(data["command_type"])
+    return CommandRequest.construct(**data)
+
+
+# build messages without validating them, only for trusted peers
+_TRUSTED_DECODERS: Dict[int, Callable[[Dict[str, Any]], CommandBase]] = {
+    MessageKind.COMMAND_REQUEST: _construct_command_request,
+    MessageKind.COMMAND_RECEIVED: lambda data: CommandReceived.construct(**data),
+    MessageKind.COMMAND_REPLY: lambda data: CommandReply.construct(**data),
+}
+
+
+def pack_batch(frames: List[bytes]) -> bytes:
+    """packs multiple message frames in a single frame"""
+    header = bytes((ENVELOPE_MARKER, ENVELOPE_VERSION, MessageKind.BATCH))
+    return header + packb(frames)
+
+
+def unpack_batch(raw: bytes) -> List[bytes]:
+    """returns the frames packed by `pack_batch` or the frame itself"""
+    if _has_envelope(raw) and raw[2] == MessageKind.BATCH:
+        frames: List[bytes] = unpackb(raw[ENVELOPE_HEADER_SIZE:])
+        return frames
+    return [raw]
+
+
+def decode_message(raw: bytes, *, trusted: bool = False) -> Optional[Message]:
+    """
+    Decodes a frame using the message kind from its envelope header.
+    Frames sent by older peers without an envelope are matched against
+    all message types.
+    When `trusted`, messages with an envelope are not validated, only use
+    it for peers which completed a handshake with the same
+    `SCHEMA_FINGERPRINT`.
+
+    returns None if the frame is not recognized, raises `ValidationError`
+    if the envelope's content is not valid
+    """
+    return decode_message_frames([raw], trusted=trusted)
+
+
+def decode_message_frames(
+    frames: Sequence[Buffer], *, trusted: bool = False
+) -> Optional[Message]:
+    """same as `decode_message` for the frames created by `to_frames`"""
+    raw: bytes = bytes(frames[0])
+    out_of_band: Sequence[Buffer] = frames[1:]
+
+    def _unpack(data: bytes) -> Any:
+        if out_of_band:
+            return unpackb_frames([data, *out_of_band])
+        return unpackb(data)
+
+    if _has_envelope(raw):
+        version, kind = raw[1], raw[2]
+        message_class = _MESSAGE_CLASSES.get(kind)
+        if version != ENVELOPE_VERSION or message_class is None:
+            return None
+        data = _unpack(raw[ENVELOPE_HEADER_SIZE:])
+        if trusted and kind in _TRUSTED_DECODERS:
+            return _TRUSTED_DECODERS[kind](data)  # type: ignore
+        return message_class.parse_obj(data)  # type: ignore
+
+    # NOTE: pydantic does not support polymorphism
+    # SEE https://github.com/samuelcolvin/pydantic/issues/503
+    # below try catch pattern is how to deal with it
+    data = _unpack(raw)
+    for message_class in _LEGACY_MESSAGE_CLASSES:
+        try:
+            return message_class.parse_obj(data)  # type: ignore
+        except ValidationError:
+            pass
+    return None
+
+
 class TrackedRequest(BaseModel):
+    # used to wake up callers waiting for the reply
+    _reply_received: Event = PrivateAttr(default_factory=Event)
+
     request: CommandRequest = Field(..., description="request being tracked")
     reply: Optional[CommandReply] = Field(
         None, description="reply will be not None if received"
     )
 
+    def set_reply(self, reply: CommandReply) -> None:
+        self.reply = reply
+        self._reply_received.set()
+
+    def wait_for_reply(self, timeout: float) -> bool:
+        """returns True if the reply was received before the timeout"""
+        return self._reply_received.wait(timeout)
+
+
+class RequestsTrackerStats(BaseModel):
+    tracked: int = Field(..., description="requests currently tracked")
+    evicted_expired: int = Field(
+        ..., description="requests evicted because they were older than the ttl"
+    )
+    evicted_over_max_size: int = Field(
+        ..., description="oldest requests evicted to stay within max_size"
+    )
+
+
+class RequestsTracker:
+    """
+    Thread safe storage for the requests waiting for a reply.
+
+    - `max_size`: when exceeded the oldest requests are evicted
+    - `ttl`: requests tracked for longer than `ttl` seconds are evicted
+    """
+
+    def __init__(
+        self, max_size: Optional[int] = None, ttl: Optional[float] = None
+    ) -> None:
+        if max_size is not None and max_size < 1:
+            raise ValueError(f"max_size={max_size} must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError(f"ttl={ttl} must be greater than 0")
+
+        self.max_size: Optional[int] = max_size
+        self.ttl: Optional[float] = ttl
+
+        # NOTE: insertion order is also expiration order
+        self._tracked: OrderedDict[str, Tuple[float, TrackedRequest]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+        self._evicted_expired: int = 0
+        self._evicted_over_max_size: int = 0
+
+    def _evict_expired(self, now: float) -> None:
+        if self.ttl is None:
+            return
+        while self._tracked:
+            _, (added_at, _) = next(iter(self._tracked.items()))
+            if now - added_at < self.ttl:
+                return
+            self._tracked.popitem(last=False)
+            self._evicted_expired += 1
+
+    def add(self, tracked_request: TrackedRequest) -> None:
+        now = monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            self._tracked[tracked_request.request.request_id] = (now, tracked_request)
+            if self.max_size is not None and len(self._tracked) > self.max_size:
+                self._tracked.popitem(last=False)
+                self._evicted_over_max_size += 1
+
+    def get(self, request_id: str) -> Optional[TrackedRequest]:
+        with self._lock:
+            self._evict_expired(monotonic())
+            entry = self._tracked.get(request_id)
+        return None if entry is None else entry[1]
+
+    def pop(self, request_id: str) -> Optional[TrackedRequest]:
+        with self._lock:
+            entry = self._tracked.pop(request_id, None)
+        return None if entry is None else entry[1]
+
+    def __len__(self) -> int:
+        return len(self._tracked)
 
-RequestsTracker = Dict[str, TrackedRequest]
+    def get_stats(self) -> RequestsTrackerStats:
+        with self._lock:
+            self._evict_expired(monotonic())
+            return RequestsTrackerStats(
+                tracked=len(self._tracked),
+                evicted_expired=self._evicted_expired,
+                evicted_over_max_size=self._evicted_over_max_size,
+            )
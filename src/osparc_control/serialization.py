@@ -0,0 +1,298 @@
+"""
+msgpack serialization used for the content of messages.
+
+When NumPy is installed, arrays and NumPy scalars are packed as a msgpack
+ext type: a header with the dtype and shape followed by the raw buffer.
+They are decoded with `np.frombuffer`, without converting them to
+Python objects. Decoded arrays are read-only views over the received data,
+`.copy()` them if they need to be modified.
+
+`packb_frames` moves large binary buffers (arrays, bytes) out of the
+msgpack data into separate frames, referenced by their index, so that
+transports supporting multipart messages send them without copying.
+
+Encoding is delegated to a codec. The C accelerated `msgpack` package is
+used when installed, `umsgpack` otherwise. All codecs produce standard
+msgpack, peers using different codecs understand each other.
+"""
+import struct
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import umsgpack  # type: ignore
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE: bool = True
+except ImportError:  # pragma: no cover
+    NUMPY_AVAILABLE = False
+
+try:
+    import msgpack  # type: ignore
+
+    MSGPACK_AVAILABLE: bool = True
+except ImportError:  # pragma: no cover
+    MSGPACK_AVAILABLE = False
+
+NDARRAY_EXT_CODE: int = 1
+# the content is in the frame with the index stored in the ext data
+OUT_OF_BAND_NDARRAY_EXT_CODE: int = 2
+OUT_OF_BAND_BYTES_EXT_CODE: int = 3
+
+# buffers smaller than this are cheaper to copy than to send in their own frame
+OUT_OF_BAND_MIN_SIZE: int = 64 * 1024
+
+Buffer = Union[bytes, memoryview]
+
+# converts a value to the code and data of an ext type
+ExtPacker = Callable[[Any], Tuple[int, bytes]]
+ExtPackers = Dict[type, ExtPacker]
+# converts the data of an ext type back to a value
+ExtUnpacker = Callable[[bytes], Any]
+ExtUnpackers = Dict[int, ExtUnpacker]
+
+
+class BaseCodec(ABC):
+    """encodes and decodes msgpack, supporting custom ext types"""
+
+    name: str
+
+    @abstractmethod
+    def packb(self, obj: Any, ext_packers: ExtPackers) -> bytes:
+        """
+        Instances of the types in `ext_packers` (exact type first,
+        subclasses otherwise) are packed as ext types.
+        NOTE: builtin types are always packed as msgpack types
+        raises `TypeError` if `obj` contains types which cannot be packed
+        """
+
+    @abstractmethod
+    def unpackb(self, raw: bytes, ext_unpackers: ExtUnpackers) -> Any:
+        """ext types without an unpacker are returned as they are"""
+
+
+class UMsgPackCodec(BaseCodec):
+    """pure Python implementation, always available"""
+
+    name = "umsgpack"
+
+    def packb(self, obj: Any, ext_packers: ExtPackers) -> bytes:
+        def _to_ext(ext_packer: ExtPacker) -> Callable[[Any], umsgpack.Ext]:
+            return lambda value: umsgpack.Ext(*ext_packer(value))
+
+        try:
+            packed: bytes = umsgpack.packb(
+                obj, ext_handlers={k: _to_ext(v) for k, v in ext_packers.items()}
+            )
+        except umsgpack.UnsupportedTypeException as e:
+            raise TypeError(str(e)) from e
+        return packed
+
+    def unpackb(self, raw: bytes, ext_unpackers: ExtUnpackers) -> Any:
+        def _from_ext(ext_unpacker: ExtUnpacker) -> Callable[[umsgpack.Ext], Any]:
+            return lambda ext: ext_unpacker(ext.data)
+
+        return umsgpack.unpackb(
+            raw, ext_handlers={k: _from_ext(v) for k, v in ext_unpackers.items()}
+        )
+
+
+class MsgPackCodec(BaseCodec):
+    """C accelerated implementation, requires the `msgpack` package"""
+
+    name = "msgpack"
+
+    def packb(self, obj: Any, ext_packers: ExtPackers) -> bytes:
+        def _default(value: Any) -> Any:
+            ext_packer = ext_packers.get(type(value))
+            if ext_packer is None:
+                ext_packer = next(
+                    (v for k, v in ext_packers.items() if isinstance(value, k)), None
+                )
+            if ext_packer is None:
+                raise TypeError(f"can not serialize {type(value)} object")
+            return msgpack.ExtType(*ext_packer(value))
+
+        packed: bytes = msgpack.packb(obj, default=_default, datetime=True)
+        return packed
+
+    def unpackb(self, raw: bytes, ext_unpackers: ExtUnpackers) -> Any:
+        def _ext_hook(code: int, data: bytes) -> Any:
+            ext_unpacker = ext_unpackers.get(code)
+            if ext_unpacker is None:
+                return msgpack.ExtType(code, data)
+            return ext_unpacker(data)
+
+        return msgpack.unpackb(
+            raw, ext_hook=_ext_hook, strict_map_key=False, timestamp=3
+        )
+
+
+AVAILABLE_CODECS: Dict[str, BaseCodec] = {UMsgPackCodec.name: UMsgPackCodec()}
+if MSGPACK_AVAILABLE:
+    AVAILABLE_CODECS[MsgPackCodec.name] = MsgPackCodec()
+
+_codec: BaseCodec = AVAILABLE_CODECS.get(
+    MsgPackCodec.name, AVAILABLE_CODECS[UMsgPackCodec.name]
+)
+
+
+def get_codec() -> BaseCodec:
+    """codec currently used to encode and decode"""
+    return _codec
+
+
+def set_codec(name: str) -> None:
+    """selects one of the `AVAILABLE_CODECS` by its name"""
+    global _codec
+    if name not in AVAILABLE_CODECS:
+        raise ValueError(
+            f"Codec {name} is not available, choose one of {list(AVAILABLE_CODECS)}"
+        )
+    _codec = AVAILABLE_CODECS[name]
+
+
+# size of the dtype and shape header which precedes the raw buffer
+_HEADER_SIZE = struct.Struct("<I")
+
+
+def _as_serializable_array(value: Any) -> Any:
+    array = np.asarray(value)
+    if array.dtype.hasobject:
+        raise TypeError(f"arrays with dtype={array.dtype} cannot be serialized")
+    return array
+
+
+def _pack_ndarray(value: Any) -> Tuple[int, bytes]:
+    # NOTE: scalars are sent as 0-d arrays and flagged by a `None` shape
+    array = _as_serializable_array(value)
+    shape = None if isinstance(value, np.generic) else list(array.shape)
+
+    header: bytes = _codec.packb([array.dtype.str, shape], {})
+    data: bytes = _HEADER_SIZE.pack(len(header)) + header + array.tobytes()
+    return NDARRAY_EXT_CODE, data
+
+
+def _unpack_ndarray(raw: bytes) -> Any:
+    data = memoryview(raw)
+    (header_size,) = _HEADER_SIZE.unpack_from(data)
+    buffer_start = _HEADER_SIZE.size + header_size
+    dtype, shape = _codec.unpackb(bytes(data[_HEADER_SIZE.size : buffer_start]), {})
+
+    array = np.frombuffer(data[buffer_start:], dtype=np.dtype(dtype))
+    if shape is None:
+        return array[0]
+    return array.reshape(shape)
+
+
+class _OutOfBandBytes:
+    """marks bytes to be sent out of band"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: bytes) -> None:
+        self.data: bytes = data
+
+
+def _mark_out_of_band_bytes(obj: Any) -> Any:
+    # NOTE: codecs always pack bytes themselves, large ones
+    # are replaced by an object which is packed as an ext type
+    if isinstance(obj, bytes):
+        return _OutOfBandBytes(obj) if len(obj) >= OUT_OF_BAND_MIN_SIZE else obj
+    if isinstance(obj, dict):
+        return {k: _mark_out_of_band_bytes(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_mark_out_of_band_bytes(x) for x in obj]
+    return obj
+
+
+def _get_out_of_band_packers(buffers: List[Buffer]) -> ExtPackers:
+    """the returned handlers append out of band buffers to `buffers`"""
+
+    def _pack_bytes(value: _OutOfBandBytes) -> Tuple[int, bytes]:
+        buffers.append(value.data)
+        frame_index = len(buffers) - 1
+        return OUT_OF_BAND_BYTES_EXT_CODE, _codec.packb(frame_index, {})
+
+    packers: ExtPackers = {_OutOfBandBytes: _pack_bytes}
+    if not NUMPY_AVAILABLE:
+        return packers
+
+    def _pack_ndarray_out_of_band(value: Any) -> Tuple[int, bytes]:
+        array = _as_serializable_array(value)
+        if isinstance(value, np.generic) or array.nbytes < OUT_OF_BAND_MIN_SIZE:
+            return _pack_ndarray(value)
+
+        # NOTE: a view, no copy is made unless the array is not contiguous
+        contiguous: Any = np.ascontiguousarray(array).reshape(-1)
+        buffers.append(memoryview(contiguous.view(np.uint8)))
+        header = [array.dtype.str, list(array.shape), len(buffers) - 1]
+        return OUT_OF_BAND_NDARRAY_EXT_CODE, _codec.packb(header, {})
+
+    packers[np.ndarray] = _pack_ndarray_out_of_band
+    packers[np.generic] = _pack_ndarray_out_of_band
+    return packers
+
+
+def _get_out_of_band_unpackers(frames: Sequence[Buffer]) -> ExtUnpackers:
+    """the returned handlers fetch out of band buffers from `frames`"""
+
+    def _unpack_bytes(data: bytes) -> bytes:
+        return bytes(frames[_codec.unpackb(data, {})])
+
+    unpackers = dict(_EXT_UNPACKERS)
+    unpackers[OUT_OF_BAND_BYTES_EXT_CODE] = _unpack_bytes
+    if not NUMPY_AVAILABLE:
+        return unpackers
+
+    def _unpack_ndarray_out_of_band(data: bytes) -> Any:
+        dtype, shape, frame_index = _codec.unpackb(data, {})
+        array = np.frombuffer(frames[frame_index], dtype=np.dtype(dtype))
+        return array.reshape(shape)
+
+    unpackers[OUT_OF_BAND_NDARRAY_EXT_CODE] = _unpack_ndarray_out_of_band
+    return unpackers
+
+
+_EXT_PACKERS: ExtPackers = {}
+_EXT_UNPACKERS: ExtUnpackers = {}
+if NUMPY_AVAILABLE:
+    _EXT_PACKERS[np.ndarray] = _pack_ndarray
+    _EXT_PACKERS[np.generic] = _pack_ndarray
+    _EXT_UNPACKERS[NDARRAY_EXT_CODE] = _unpack_ndarray
+
+
+def packb(obj: Any) -> bytes:
+    """msgpack encodes `obj`, NumPy arrays are supported if installed"""
+    return _codec.packb(obj, _EXT_PACKERS)
+
+
+def unpackb(raw: bytes) -> Any:
+    """decodes data encoded with `packb`"""
+    return _codec.unpackb(raw, _EXT_UNPACKERS)
+
+
+def packb_frames(obj: Any) -> List[Buffer]:
+    """
+    Like `packb`, but returns a list of frames: the msgpack encoded data,
+    followed by the out of band buffers it references.
+    NOTE: buffers are not copied, they must not change until sent
+    """
+    frames: List[Buffer] = [b""]
+    frames[0] = _codec.packb(
+        _mark_out_of_band_bytes(obj), _get_out_of_band_packers(frames)
+    )
+    return frames
+
+
+def unpackb_frames(frames: Sequence[Buffer]) -> Any:
+    """decodes frames created by `packb_frames`"""
+    return _codec.unpackb(bytes(frames[0]), _get_out_of_band_unpackers(frames))
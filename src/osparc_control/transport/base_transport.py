@@ -1,7 +1,15 @@
 from abc import ABCMeta
 from abc import abstractmethod
 from typing import Any
+from time import sleep
+from typing import List
 from typing import Optional
+from typing import Sequence
+
+from ..serialization import Buffer
+
+# used by transports which cannot wait on readiness, see `wait_for_messages`
+DEFAULT_POLL_INTERVAL: float = 0.01
 
 
 class BaseTransportMeta(ABCMeta):
@@ -9,10 +17,27 @@ class BaseTransportMeta(ABCMeta):
 
 
 class BaseTransport(metaclass=BaseTransportMeta):
+    # set by transports able to send multipart messages, see `send_frames`
+    supports_frames: bool = False
+
     @abstractmethod
     def send_bytes(self, payload: bytes) -> None:  # noqa: N804
         """sends bytes to remote"""
 
+    def send_frames(self, frames: Sequence[Buffer]) -> None:  # noqa: N804
+        """
+        sends all frames to remote as a single multipart message
+        NOTE: only used if `supports_frames` is True
+        """
+        raise NotImplementedError()
+
+    def receive_frames(self) -> Optional[List[Buffer]]:  # noqa: N804
+        """
+        same as `receive_bytes`, returns all the frames of a multipart message
+        """
+        payload: Optional[bytes] = self.receive_bytes()
+        return None if payload is None else [payload]
+
     @abstractmethod
     def receive_bytes(self) -> Optional[bytes]:  # noqa: N804
         """
@@ -21,6 +46,23 @@ class BaseTransport(metaclass=BaseTransportMeta):
         nothing is avaliable
         """
 
+    def wait_for_messages(self, timeout: float) -> bool:  # noqa: N804
+        """
+        Blocks until messages are available, `wakeup_receiver` is called
+        or `timeout` seconds pass. Returns True if messages might be available.
+        NOTE: the default implementation falls back to sleeping for
+        `DEFAULT_POLL_INTERVAL`, transports which can wait on readiness
+        should override it
+        """
+        sleep(min(timeout, DEFAULT_POLL_INTERVAL))
+        return True
+
+    def wakeup_receiver(self) -> None:  # noqa: N804
+        """
+        Interrupts a pending `wait_for_messages`.
+        NOTE: this is called from a different thread than the receiver's
+        """
+
     @abstractmethod
     def sender_init(self) -> None:  # noqa: N804
         """
@@ -57,9 +99,16 @@ class SenderReceiverPair:
         """called by the background thread dealing with the sender"""
         self._sender.sender_init()
 
+    @property
+    def supports_frames(self) -> bool:
+        return self._sender.supports_frames
+
     def send_bytes(self, message: bytes) -> None:
         self._sender.send_bytes(message)
 
+    def send_frames(self, frames: Sequence[Buffer]) -> None:
+        self._sender.send_frames(frames)
+
     def receiver_init(self) -> None:
         """called by the background thread dealing with the receiver"""
         self._receiver.receiver_init()
@@ -68,6 +117,18 @@ class SenderReceiverPair:
         """this must never block"""
         return self._receiver.receive_bytes()
 
+    def receive_frames(self) -> Optional[List[Buffer]]:
+        """this must never block"""
+        return self._receiver.receive_frames()
+
+    def wait_for_messages(self, timeout: float) -> bool:
+        """blocks until messages are available or woken up"""
+        return self._receiver.wait_for_messages(timeout)
+
+    def wakeup_receiver(self) -> None:
+        """interrupts a pending `wait_for_messages`, callable from any thread"""
+        self._receiver.wakeup_receiver()
+
     def sender_cleanup(self) -> None:
         self._sender.sender_cleanup()
 
@@ -80,3 +141,43 @@ class SenderReceiverPair:
 
     def __exit__(self, *args: Any) -> None:
         self.sender_cleanup()
+
+
+class BaseAsyncTransport(metaclass=BaseTransportMeta):
+    """
+    Used by asyncio based transmitters, a single instance is used
+    for both sending and receiving from the event loop
+    """
+
+    # set by transports able to send multipart messages, see `send_frames`
+    supports_frames: bool = False
+
+    @abstractmethod
+    async def send_bytes(self, payload: bytes) -> None:  # noqa: N804
+        """sends bytes to remote"""
+
+    async def send_frames(self, frames: Sequence[Buffer]) -> None:  # noqa: N804
+        """
+        sends all frames to remote as a single multipart message
+        NOTE: only used if `supports_frames` is True
+        """
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def receive_bytes(self) -> bytes:  # noqa: N804
+        """waits until bytes from remote are available and returns them"""
+
+    async def receive_frames(self) -> List[Buffer]:  # noqa: N804
+        """
+        same as `receive_bytes`, returns all the frames of a multipart message
+        """
+        return [await self.receive_bytes()]
+
+    @abstractmethod
+    def init(self) -> None:  # noqa: N804
+        """called from the event loop before sending and receiving"""
+
+    def cleanup(self) -> None:  # noqa: N804
+        """
+        Some libraries require cleanup when done with them
+        """
@@ -1,8 +1,12 @@
+import asyncio
+from collections import deque
 from queue import Empty
 from queue import Queue
+from typing import Deque
 from typing import Dict
 from typing import Optional
 
+from .base_transport import BaseAsyncTransport
 from .base_transport import BaseTransport
 
 
@@ -15,7 +19,8 @@ class InMemoryTransport(BaseTransport):
     - fetches data from `source`
     """
 
-    _SHARED_QUEUES: Dict[str, "Queue[bytes]"] = {}
+    # NOTE: `None` is used to wake up a receiver waiting for messages
+    _SHARED_QUEUES: Dict[str, "Queue[Optional[bytes]]"] = {}
 
     def __init__(self, source: str, destination: str):
         self.source: str = source
@@ -24,15 +29,42 @@ class InMemoryTransport(BaseTransport):
         self._SHARED_QUEUES[self.source] = Queue()
         self._SHARED_QUEUES[self.destination] = Queue()
 
+        # messages fetched while waiting, returned by `receive_bytes`
+        self._pending: Deque[bytes] = deque()
+
     def send_bytes(self, payload: bytes) -> None:
         self._SHARED_QUEUES[self.destination].put(payload)
 
     def receive_bytes(self) -> Optional[bytes]:
+        if self._pending:
+            return self._pending.popleft()
+
         try:
-            return self._SHARED_QUEUES[self.source].get(block=False)
+            while True:
+                message = self._SHARED_QUEUES[self.source].get(block=False)
+                if message is not None:
+                    return message
         except Empty:
             return None
 
+    def wait_for_messages(self, timeout: float) -> bool:
+        if self._pending:
+            return True
+
+        try:
+            message = self._SHARED_QUEUES[self.source].get(timeout=timeout)
+        except Empty:
+            return False
+
+        if message is None:
+            return False
+
+        self._pending.append(message)
+        return True
+
+    def wakeup_receiver(self) -> None:
+        self._SHARED_QUEUES[self.source].put(None)
+
     def sender_init(self) -> None:
         """no action required here"""
 
@@ -44,3 +76,35 @@ class InMemoryTransport(BaseTransport):
 
     def receiver_cleanup(self) -> None:
         """no action required here"""
+
+
+class AsyncInMemoryTransport(BaseAsyncTransport):
+    """
+    In memory implementation for asyncio, working with asyncio queues.
+    Both sides must run in the same event loop, use different
+    names for transports running in different event loops.
+
+    - sends data to `destination`
+    - fetches data from `source`
+    """
+
+    _SHARED_QUEUES: Dict[str, "asyncio.Queue[bytes]"] = {}
+
+    def __init__(self, source: str, destination: str):
+        self.source: str = source
+        self.destination: str = destination
+
+    async def send_bytes(self, payload: bytes) -> None:
+        self._SHARED_QUEUES[self.destination].put_nowait(payload)
+
+    async def receive_bytes(self) -> bytes:
+        return await self._SHARED_QUEUES[self.source].get()
+
+    def init(self) -> None:
+        # NOTE: created here so that queues are bound to the running event loop
+        for name in (self.source, self.destination):
+            if name not in self._SHARED_QUEUES:
+                self._SHARED_QUEUES[name] = asyncio.Queue()
+
+    def cleanup(self) -> None:
+        """no action required here"""
@@ -1,6 +1,12 @@
+from threading import Lock
+from typing import Any
+from typing import Callable
+from typing import List
 from typing import Optional
+from typing import Sequence
 
 import zmq
+import zmq.asyncio
 from tenacity import RetryError
 from tenacity import Retrying
 from tenacity.stop import stop_after_attempt
@@ -8,13 +14,25 @@ from tenacity.wait import wait_fixed
 from zmq import Context
 from zmq import Socket
 
+from ..serialization import Buffer
+from .base_transport import BaseAsyncTransport
 from .base_transport import BaseTransport
 
 RETRY_COUNT: int = 3
 WAIT_BETWEEN: float = 0.01
+# time given to deliver pending messages when closing, avoids
+# blocking the event loop forever if remote is gone
+ASYNC_LINGER_ON_CLOSE: float = 1.0
+
+
+def _from_zmq_frames(zmq_frames: List[zmq.Frame]) -> List[Buffer]:
+    # NOTE: buffers following the first frame are not copied
+    return [zmq_frames[0].bytes] + [x.buffer for x in zmq_frames[1:]]
 
 
 class ZeroMQTransport(BaseTransport):
+    supports_frames = True
+
     def __init__(self, listen_port: int, remote_host: str, remote_port: int):
         self.listen_port: int = listen_port
         self.remote_host: str = remote_host
@@ -25,29 +43,80 @@ class ZeroMQTransport(BaseTransport):
         self._send_contex: Optional[Context] = None
         self._recv_contex: Optional[Context] = None
 
+        # used to interrupt the receiver while it waits for messages
+        self._poller: Optional[zmq.Poller] = None
+        self._wakeup_recv_socket: Optional[Socket] = None
+        self._wakeup_send_socket: Optional[Socket] = None
+        self._wakeup_lock: Lock = Lock()
+
     def send_bytes(self, payload: bytes) -> None:
         assert self._send_socket  # noqa: S101
 
         self._send_socket.send(payload)  # type: ignore
 
-    def receive_bytes(self) -> Optional[bytes]:
-        assert self._recv_socket  # noqa: S101
+    def send_frames(self, frames: Sequence[Buffer]) -> None:
+        assert self._send_socket  # noqa: S101
 
+        self._send_socket.send_multipart(frames, copy=False)  # type: ignore
+
+    def _receive(self, recv: Callable[[], Any]) -> Optional[Any]:
         # try to fetch a message, using blocking sockets does not guarantee
         # that data is always present, retry 3 times in a short amount of time
         # this will guarantee the message arrives
-        message: Optional[bytes] = None
+        message: Optional[Any] = None
         try:
             for attempt in Retrying(
                 stop=stop_after_attempt(RETRY_COUNT), wait=wait_fixed(WAIT_BETWEEN)
             ):
                 with attempt:
-                    message = self._recv_socket.recv(zmq.NOBLOCK)  # type: ignore
+                    message = recv()
         except RetryError:
             pass
 
         return message
 
+    def receive_bytes(self) -> Optional[bytes]:
+        assert self._recv_socket  # noqa: S101
+        recv_socket = self._recv_socket
+
+        message: Optional[bytes] = self._receive(
+            lambda: recv_socket.recv(zmq.NOBLOCK)  # type: ignore
+        )
+        return message
+
+    def receive_frames(self) -> Optional[List[Buffer]]:
+        assert self._recv_socket  # noqa: S101
+        recv_socket = self._recv_socket
+
+        zmq_frames: Optional[List[zmq.Frame]] = self._receive(
+            lambda: recv_socket.recv_multipart(zmq.NOBLOCK, copy=False)
+        )
+        return None if zmq_frames is None else _from_zmq_frames(zmq_frames)
+
+    def wait_for_messages(self, timeout: float) -> bool:
+        assert self._poller  # noqa: S101
+        assert self._wakeup_recv_socket  # noqa: S101
+
+        events = dict(self._poller.poll(int(timeout * 1000)))
+        if self._wakeup_recv_socket in events:
+            # consume all pending wakeups
+            try:
+                while True:
+                    self._wakeup_recv_socket.recv(zmq.NOBLOCK)  # type: ignore
+            except zmq.Again:
+                pass
+
+        return self._recv_socket in events
+
+    def wakeup_receiver(self) -> None:
+        with self._wakeup_lock:
+            if self._wakeup_send_socket is None:
+                return  # receiver was not started or was already stopped
+            try:
+                self._wakeup_send_socket.send(b"", zmq.NOBLOCK)  # type: ignore
+            except zmq.Again:  # pragma: no cover
+                pass  # a wakeup is already pending
+
     def sender_init(self) -> None:
         self._send_contex = zmq.Context()  # type: ignore
         self._send_socket = self._send_contex.socket(zmq.PUSH)  # type: ignore
@@ -60,6 +129,19 @@ class ZeroMQTransport(BaseTransport):
             f"tcp://{self.remote_host}:{self.remote_port}"
         )
 
+        wakeup_address = f"inproc://wakeup-{id(self)}"
+        self._wakeup_recv_socket = self._recv_contex.socket(zmq.PAIR)  # type: ignore
+        self._wakeup_recv_socket.bind(wakeup_address)  # type: ignore
+
+        self._poller = zmq.Poller()
+        self._poller.register(self._recv_socket, zmq.POLLIN)
+        self._poller.register(self._wakeup_recv_socket, zmq.POLLIN)
+
+        wakeup_send_socket = self._recv_contex.socket(zmq.PAIR)  # type: ignore
+        wakeup_send_socket.connect(wakeup_address)
+        with self._wakeup_lock:
+            self._wakeup_send_socket = wakeup_send_socket
+
     def sender_cleanup(self) -> None:
         assert self._send_socket  # noqa: S101
         self._send_socket.close()  # type: ignore
@@ -67,7 +149,70 @@ class ZeroMQTransport(BaseTransport):
         self._send_contex.term()  # type: ignore
 
     def receiver_cleanup(self) -> None:
+        with self._wakeup_lock:
+            assert self._wakeup_send_socket  # noqa: S101
+            self._wakeup_send_socket.close(linger=0)  # type: ignore
+            self._wakeup_send_socket = None
+        assert self._wakeup_recv_socket  # noqa: S101
+        self._wakeup_recv_socket.close(linger=0)  # type: ignore
+
         assert self._recv_socket  # noqa: S101
         self._recv_socket.close()  # type: ignore
         assert self._recv_contex  # noqa: S101
         self._recv_contex.term()  # type: ignore
+
+
+class AsyncZeroMQTransport(BaseAsyncTransport):
+    """asyncio version of `ZeroMQTransport`, compatible with it on the wire"""
+
+    supports_frames = True
+
+    def __init__(self, listen_port: int, remote_host: str, remote_port: int):
+        self.listen_port: int = listen_port
+        self.remote_host: str = remote_host
+        self.remote_port: int = remote_port
+
+        self._context: Optional[zmq.asyncio.Context] = None
+        self._recv_socket: Optional[zmq.asyncio.Socket] = None
+        self._send_socket: Optional[zmq.asyncio.Socket] = None
+
+    async def send_bytes(self, payload: bytes) -> None:
+        assert self._send_socket  # noqa: S101
+
+        await self._send_socket.send(payload)  # type: ignore
+
+    async def send_frames(self, frames: Sequence[Buffer]) -> None:
+        assert self._send_socket  # noqa: S101
+
+        await self._send_socket.send_multipart(frames, copy=False)  # type: ignore
+
+    async def receive_bytes(self) -> bytes:
+        assert self._recv_socket  # noqa: S101
+
+        message: bytes = await self._recv_socket.recv()  # type: ignore
+        return message
+
+    async def receive_frames(self) -> List[Buffer]:
+        assert self._recv_socket  # noqa: S101
+
+        zmq_frames: List[zmq.Frame] = await self._recv_socket.recv_multipart(
+            copy=False
+        )  # type: ignore
+        return _from_zmq_frames(zmq_frames)
+
+    def init(self) -> None:
+        self._context = zmq.asyncio.Context()
+        self._send_socket = self._context.socket(zmq.PUSH)
+        self._send_socket.bind(f"tcp://*:{self.listen_port}")  # type: ignore
+        self._recv_socket = self._context.socket(zmq.PULL)
+        self._recv_socket.connect(  # type: ignore
+            f"tcp://{self.remote_host}:{self.remote_port}"
+        )
+
+    def cleanup(self) -> None:
+        assert self._send_socket  # noqa: S101
+        self._send_socket.close(linger=int(ASYNC_LINGER_ON_CLOSE * 1000))
+        assert self._recv_socket  # noqa: S101
+        self._recv_socket.close(linger=0)
+        assert self._context  # noqa: S101
+        self._context.term()  # type: ignore
@@ -0,0 +1,114 @@
+import statistics
+from threading import Event
+from threading import Thread
+from time import sleep
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+import pytest
+from _pytest.fixtures import SubRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+import osparc_control
+from osparc_control.core import PairedTransmitter
+from osparc_control.models import CommandManifest
+from osparc_control.models import CommandParameter
+from osparc_control.models import CommandType
+from osparc_control.transport.base_transport import SenderReceiverPair
+from osparc_control.transport.in_memory import InMemoryTransport
+
+# NOTE: benchmarks print their results, use `make benchmarks` to see them
+
+REQUESTER_PORT: int = 3456
+REPLIER_PORT: int = 3457
+
+# how often the replier checks for incoming requests
+REPLIER_LOOP_INTERVAL: float = 0.0001
+
+
+def _get_in_memory_sender_receiver_pair(
+    listen_port: int, remote_host: str, remote_port: int
+) -> SenderReceiverPair:
+    sender = InMemoryTransport(source=f"{listen_port}", destination=f"{remote_port}")
+    receiver = InMemoryTransport(source=f"{listen_port}", destination=f"{remote_port}")
+    return SenderReceiverPair(sender=sender, receiver=receiver)
+
+
+def _replier_worker(replier: PairedTransmitter, stop: Event) -> None:
+    while not stop.is_set():
+        for command in replier.get_incoming_requests():
+            replier.reply_to_command(
+                request_id=command.request_id, payload=command.params["payload"]
+            )
+        sleep(REPLIER_LOOP_INTERVAL)
+
+
+@pytest.fixture
+def echo_manifest() -> CommandManifest:
+    return CommandManifest(
+        action="echo",
+        description="replies with the provided payload",
+        params=[CommandParameter(name="payload", description="returned as is")],
+        command_type=CommandType.WITH_IMMEDIATE_REPLY,
+    )
+
+
+@pytest.fixture(params=["in_memory", "zeromq"])
+def transport_name(request: SubRequest, monkeypatch: MonkeyPatch) -> str:
+    if request.param == "in_memory":
+        monkeypatch.setattr(
+            osparc_control.core,
+            "_get_sender_receiver_pair",
+            _get_in_memory_sender_receiver_pair,
+        )
+    return request.param  # type: ignore
+
+
+@pytest.fixture
+def requester_and_replier(
+    transport_name: str, echo_manifest: CommandManifest
+) -> Iterable[Tuple[PairedTransmitter, PairedTransmitter]]:
+    """the replier echoes back the `payload` param of each request"""
+    requester = PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=[],
+        remote_port=REPLIER_PORT,
+        listen_port=REQUESTER_PORT,
+    )
+    replier = PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=[echo_manifest],
+        remote_port=REQUESTER_PORT,
+        listen_port=REPLIER_PORT,
+    )
+
+    stop = Event()
+    replier_thread = Thread(target=_replier_worker, args=(replier, stop), daemon=True)
+
+    with requester, replier:
+        replier_thread.start()
+        yield requester, replier
+        stop.set()
+        replier_thread.join()
+
+
+@pytest.fixture
+def report_timings(transport_name: str) -> Callable[[str, List[float]], None]:
+    def _report(name: str, durations: List[float]) -> None:
+        ordered = sorted(durations)
+
+        def _percentile(percent: float) -> float:
+            index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+            return ordered[index] * 1000
+
+        print(
+            f"\n[{transport_name}] {name}: n={len(ordered)} "
+            f"mean={statistics.mean(ordered) * 1000:.3f}ms "
+            f"p50={_percentile(50):.3f}ms "
+            f"p90={_percentile(90):.3f}ms "
+            f"p99={_percentile(99):.3f}ms"
+        )
+
+    return _report
@@ -0,0 +1,26 @@
+from time import perf_counter
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+from osparc_control.core import PairedTransmitter
+
+ROUND_TRIPS: int = 200
+
+
+def test_request_with_immediate_reply_round_trip(
+    requester_and_replier: Tuple[PairedTransmitter, PairedTransmitter],
+    report_timings: Callable[[str, List[float]], None],
+) -> None:
+    requester, _ = requester_and_replier
+
+    durations: List[float] = []
+    for k in range(ROUND_TRIPS):
+        start = perf_counter()
+        result = requester.request_with_immediate_reply(
+            "echo", params={"payload": k}, timeout=1.0
+        )
+        durations.append(perf_counter() - start)
+        assert result == k
+
+    report_timings("request_with_immediate_reply round trip", durations)
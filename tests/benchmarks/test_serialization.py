@@ -0,0 +1,55 @@
+from time import perf_counter
+from typing import Iterable
+
+import pytest
+from _pytest.fixtures import SubRequest
+
+from osparc_control.models import CommandReceived
+from osparc_control.models import CommandReply
+from osparc_control.models import CommandRequest
+from osparc_control.models import CommandType
+from osparc_control.models import decode_message
+from osparc_control.models import Message
+from osparc_control.serialization import AVAILABLE_CODECS
+from osparc_control.serialization import get_codec
+from osparc_control.serialization import set_codec
+
+ITERATIONS: int = 5000
+
+MESSAGES = [
+    CommandRequest(
+        request_id="unique_id",
+        action="add_numbers",
+        params={"a": 1, "b": 2.5, "name": "a string"},
+        command_type=CommandType.WITH_DELAYED_REPLY,
+    ),
+    CommandReceived(request_id="unique_id", accepted=True, error_message=None),
+    CommandReply(reply_id="unique_id", payload=list(range(100))),
+]
+
+
+@pytest.fixture(params=list(AVAILABLE_CODECS))
+def codec_name(request: SubRequest) -> Iterable[str]:
+    previous = get_codec().name
+    set_codec(request.param)
+    yield request.param
+    set_codec(previous)
+
+
+@pytest.mark.parametrize("message", MESSAGES, ids=lambda x: type(x).__name__)
+def test_encode_decode_throughput(codec_name: str, message: Message) -> None:
+    start = perf_counter()
+    for _ in range(ITERATIONS):
+        raw = message.to_bytes()
+    encode_duration = perf_counter() - start
+
+    start = perf_counter()
+    for _ in range(ITERATIONS):
+        decode_message(raw)
+    decode_duration = perf_counter() - start
+
+    print(
+        f"\n[{codec_name}] {type(message).__name__}: "
+        f"encode={ITERATIONS / encode_duration:.0f} msg/s "
+        f"decode={ITERATIONS / decode_duration:.0f} msg/s"
+    )
@@ -0,0 +1,327 @@
+import asyncio
+import random
+from threading import Event
+from threading import Thread
+from typing import Any
+from typing import Awaitable
+from typing import Iterable
+from typing import List
+from typing import Tuple
+
+import pytest
+from _pytest.fixtures import SubRequest
+from _pytest.monkeypatch import MonkeyPatch
+
+import osparc_control
+from osparc_control.async_core import AsyncPairedTransmitter
+from osparc_control.core import PairedTransmitter
+from osparc_control.errors import CommandConfirmationTimeoutError
+from osparc_control.errors import CommandNotAcceptedError
+from osparc_control.models import CommandManifest
+from osparc_control.models import CommandParameter
+from osparc_control.models import CommandType
+from osparc_control.transport.base_transport import BaseAsyncTransport
+from osparc_control.transport.in_memory import AsyncInMemoryTransport
+
+PORT_A: int = 1244
+PORT_B: int = 1245
+
+# UTILS
+
+
+def _run(coroutine: Awaitable[Any]) -> Any:
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+def _get_async_paired_transmitter(
+    *, local_port: int, remote_port: int, exposed_commands: List[CommandManifest]
+) -> AsyncPairedTransmitter:
+    return AsyncPairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=exposed_commands,
+        remote_port=remote_port,
+        listen_port=local_port,
+    )
+
+
+async def _reply_to_requests(transmitter: AsyncPairedTransmitter) -> None:
+    async for command in transmitter.incoming_requests():
+        if command.action == "add_numbers":
+            await transmitter.reply_to_command(
+                request_id=command.request_id, payload=sum(command.params.values())
+            )
+        if command.action == "get_random":
+            await transmitter.reply_to_command(
+                request_id=command.request_id,
+                payload=random.randint(1, 1000),  # noqa: S311
+            )
+
+
+# FIXTURES
+
+
+@pytest.fixture
+def event_loop() -> Iterable[asyncio.AbstractEventLoop]:
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(params=["in_memory", "zeromq"])
+def transport_name(
+    request: SubRequest, monkeypatch: MonkeyPatch, event_loop: asyncio.AbstractEventLoop
+) -> str:
+    if request.param == "in_memory":
+
+        def _get_async_in_memory_transport(
+            listen_port: int, remote_host: str, remote_port: int
+        ) -> BaseAsyncTransport:
+            # names are unique per event loop
+            return AsyncInMemoryTransport(
+                source=f"{id(event_loop)}_{listen_port}",
+                destination=f"{id(event_loop)}_{remote_port}",
+            )
+
+        monkeypatch.setattr(
+            osparc_control.async_core,
+            "_get_async_transport",
+            _get_async_in_memory_transport,
+        )
+    return request.param  # type: ignore
+
+
+@pytest.fixture
+def mainfest_b() -> List[CommandManifest]:
+    add_numbers = CommandManifest(
+        action="add_numbers",
+        description="adds two numbers",
+        params=[
+            CommandParameter(name="a", description="param to add"),
+            CommandParameter(name="b", description="param to add"),
+        ],
+        command_type=CommandType.WITH_DELAYED_REPLY,
+    )
+
+    get_random = CommandManifest(
+        action="get_random",
+        description="returns a random number",
+        params=[],
+        command_type=CommandType.WITH_IMMEDIATE_REPLY,
+    )
+
+    greet_user = CommandManifest(
+        action="greet_user",
+        description="prints the status of the solver",
+        params=[CommandParameter(name="name", description="name to greet")],
+        command_type=CommandType.WITHOUT_REPLY,
+    )
+
+    return [add_numbers, get_random, greet_user]
+
+
+@pytest.fixture
+def transmitters(
+    transport_name: str,
+    mainfest_b: List[CommandManifest],
+    event_loop: asyncio.AbstractEventLoop,
+) -> Iterable[Tuple[AsyncPairedTransmitter, AsyncPairedTransmitter]]:
+    transmitter_a = _get_async_paired_transmitter(
+        local_port=PORT_A, remote_port=PORT_B, exposed_commands=[]
+    )
+    transmitter_b = _get_async_paired_transmitter(
+        local_port=PORT_B, remote_port=PORT_A, exposed_commands=mainfest_b
+    )
+    _run(transmitter_a.start_background_sync())
+    _run(transmitter_b.start_background_sync())
+
+    yield transmitter_a, transmitter_b
+
+    _run(transmitter_a.stop_background_sync())
+    _run(transmitter_b.stop_background_sync())
+
+
+# TESTS
+
+
+def test_context_manager(
+    transport_name: str, mainfest_b: List[CommandManifest]
+) -> None:
+    async def _test() -> None:
+        async with _get_async_paired_transmitter(
+            local_port=PORT_B, remote_port=PORT_A, exposed_commands=mainfest_b
+        ):
+            pass
+
+    _run(_test())
+
+
+def test_request_with_delayed_reply(
+    transmitters: Tuple[AsyncPairedTransmitter, AsyncPairedTransmitter],
+) -> None:
+    transmitter_a, transmitter_b = transmitters
+
+    async def _test() -> None:
+        replier = asyncio.ensure_future(_reply_to_requests(transmitter_b))
+
+        reply = await transmitter_a.request_with_delayed_reply(
+            "add_numbers", params={"a": 10, "b": 13.3}
+        )
+        assert await reply == 23.3
+
+        replier.cancel()
+
+    _run(_test())
+
+
+def test_large_array_payloads(
+    transmitters: Tuple[AsyncPairedTransmitter, AsyncPairedTransmitter],
+) -> None:
+    np = pytest.importorskip("numpy")
+    transmitter_a, transmitter_b = transmitters
+    a, b = np.random.rand(500, 500), np.random.rand(500, 500)
+
+    async def _test() -> None:
+        replier = asyncio.ensure_future(_reply_to_requests(transmitter_b))
+
+        reply = await transmitter_a.request_with_delayed_reply(
+            "add_numbers", params={"a": a, "b": b}
+        )
+        assert np.array_equal(await reply, a + b)
+
+        replier.cancel()
+
+    _run(_test())
+
+
+def test_request_with_immediate_reply(
+    transmitters: Tuple[AsyncPairedTransmitter, AsyncPairedTransmitter],
+) -> None:
+    transmitter_a, transmitter_b = transmitters
+
+    async def _test() -> None:
+        random_integer = await transmitter_a.request_with_immediate_reply(
+            "get_random", timeout=0.1
+        )
+        assert random_integer is None
+
+        replier = asyncio.ensure_future(_reply_to_requests(transmitter_b))
+
+        random_integers = await asyncio.gather(
+            *(
+                transmitter_a.request_with_immediate_reply("get_random", timeout=1.0)
+                for _ in range(100)
+            )
+        )
+        assert all(1 <= x <= 1000 for x in random_integers)
+
+        replier.cancel()
+
+    _run(_test())
+
+
+def test_request_without_reply(
+    transmitters: Tuple[AsyncPairedTransmitter, AsyncPairedTransmitter],
+) -> None:
+    transmitter_a, transmitter_b = transmitters
+
+    async def _test() -> None:
+        await transmitter_a.request_without_reply(
+            "greet_user", params={"name": "tester"}
+        )
+        async for command in transmitter_b.incoming_requests():
+            assert command.action == "greet_user"
+            assert command.params == {"name": "tester"}
+            break
+
+    _run(_test())
+
+
+def test_incoming_requests_stop_with_transmitter(
+    transport_name: str, mainfest_b: List[CommandManifest]
+) -> None:
+    async def _test() -> None:
+        transmitter = _get_async_paired_transmitter(
+            local_port=PORT_B, remote_port=PORT_A, exposed_commands=mainfest_b
+        )
+        await transmitter.start_background_sync()
+
+        async def _consume() -> int:
+            return len([x async for x in transmitter.incoming_requests()])
+
+        consumers = asyncio.gather(_consume(), _consume())
+        await transmitter.stop_background_sync()
+        assert await consumers == [0, 0]
+
+    _run(_test())
+
+
+@pytest.mark.parametrize(
+    "action, params",
+    [
+        ("command_not_defined", None),
+        ("add_numbers", None),
+        ("greet_user", {"nope": 123}),
+    ],
+)
+def test_command_not_accepted(
+    transmitters: Tuple[AsyncPairedTransmitter, AsyncPairedTransmitter],
+    action: str,
+    params: Any,
+) -> None:
+    transmitter_a, _ = transmitters
+
+    with pytest.raises(CommandNotAcceptedError):
+        _run(transmitter_a.request_without_reply(action, params))
+
+
+def test_side_b_does_not_reply_in_time(
+    transport_name: str, monkeypatch: MonkeyPatch
+) -> None:
+    monkeypatch.setattr(osparc_control.async_core, "WAIT_FOR_RECEIVED_S", 0.01)
+
+    async def _test() -> None:
+        # nothing is listening on the remote port
+        async with _get_async_paired_transmitter(
+            local_port=8263, remote_port=8264, exposed_commands=[]
+        ) as transmitter:
+            with pytest.raises(CommandConfirmationTimeoutError):
+                await transmitter.request_without_reply("no_remote_side_for_command")
+
+    _run(_test())
+
+
+def test_interoperates_with_paired_transmitter(
+    mainfest_b: List[CommandManifest], event_loop: asyncio.AbstractEventLoop
+) -> None:
+    replier = PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=mainfest_b,
+        remote_port=PORT_A,
+        listen_port=PORT_B,
+    )
+
+    stop = Event()
+
+    def _replier_worker() -> None:
+        while not stop.is_set():
+            for command in replier.get_incoming_requests():
+                replier.reply_to_command(
+                    request_id=command.request_id, payload=sum(command.params.values())
+                )
+
+    async def _test() -> None:
+        async with _get_async_paired_transmitter(
+            local_port=PORT_A, remote_port=PORT_B, exposed_commands=[]
+        ) as transmitter:
+            reply = await transmitter.request_with_delayed_reply(
+                "add_numbers", params={"a": 1, "b": 2}
+            )
+            assert await asyncio.wait_for(reply, timeout=1.0) == 3
+
+    thread = Thread(target=_replier_worker, daemon=True)
+    with replier:
+        thread.start()
+        _run(_test())
+        stop.set()
+        thread.join()
@@ -1,7 +1,10 @@
 import random
 import time
+from threading import Thread
+from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Optional
 
 import pytest
 from pydantic import ValidationError
@@ -133,6 +136,10 @@ def test_request_with_delayed_reply(
     assert has_result is True
     assert result is not None
 
+    # consumed replies are no longer tracked
+    assert paired_transmitter_a.check_for_reply(request_id=request_id) == (False, None)
+    assert paired_transmitter_a.get_request_tracker_stats().tracked == 0
+
 
 def test_request_with_immediate_reply(
     paired_transmitter_a: PairedTransmitter, paired_transmitter_b: PairedTransmitter
@@ -170,6 +177,8 @@ def test_request_with_immediate_reply(
 
     thread.join()
 
+    assert paired_transmitter_a.get_request_tracker_stats().tracked == 0
+
 
 def test_request_without_reply(
     paired_transmitter_a: PairedTransmitter, paired_transmitter_b: PairedTransmitter
@@ -188,6 +197,9 @@ def test_request_without_reply(
             assert message == expected_message
             wait_for_requests = False
 
+    # no reply is expected, request is not tracked after confirmation
+    assert paired_transmitter_a.get_request_tracker_stats().tracked == 0
+
 
 @pytest.mark.parametrize("command_type", ALL_COMMAND_TYPES)
 def test_no_same_action_command_in_exposed_commands(command_type: CommandType) -> None:
@@ -225,8 +237,9 @@ def test_command_params_mismatch(
 
 
 def test_side_b_does_not_reply_in_time(mock_wait_for_received: None) -> None:
+    # nothing is listening on the remote port
     paired_transmitter = _get_paired_transmitter(
-        local_port=8263, remote_port=8263, exposed_commands=[]
+        local_port=8263, remote_port=8264, exposed_commands=[]
     )
     paired_transmitter.start_background_sync()
     with pytest.raises(CommandConfirmationTimeoutError):
@@ -243,3 +256,190 @@ def test_paired_transmitter_validation() -> None:
             remote_port=1,
             listen_port=2,
         )
+
+
+def test_stop_background_sync_does_not_wait_for_messages(
+    mainfest_b: List[CommandManifest],
+) -> None:
+    paired_transmitter = _get_paired_transmitter(
+        local_port=1235, remote_port=1234, exposed_commands=mainfest_b
+    )
+    paired_transmitter.start_background_sync()
+    # allow the receiver to start waiting
+    time.sleep(WAIT_FOR_DELIVERY)
+
+    start = time.time()
+    paired_transmitter.stop_background_sync()
+    assert time.time() - start < osparc_control.core.WAIT_FOR_MESSAGES
+
+
+def test_concurrent_requests_receive_own_confirmation(
+    paired_transmitter_a: PairedTransmitter, paired_transmitter_b: PairedTransmitter
+) -> None:
+    results: Dict[int, Optional[Exception]] = {}
+
+    def _request(index: int) -> None:
+        try:
+            # odd requests are refused by remote
+            if index % 2:
+                paired_transmitter_a.request_without_reply("command_not_defined")
+            else:
+                paired_transmitter_a.request_without_reply(
+                    "greet_user", params={"name": f"tester{index}"}
+                )
+            results[index] = None
+        except CommandNotAcceptedError as e:
+            results[index] = e
+
+    threads = [Thread(target=_request, args=(i,), daemon=True) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for index, error in results.items():
+        if index % 2:
+            assert isinstance(error, CommandNotAcceptedError)
+        else:
+            assert error is None
+    assert len(results) == 20
+    assert paired_transmitter_a._pending_confirmations == {}
+
+
+def test_request_tracker_limits(mainfest_b: List[CommandManifest]) -> None:
+    with PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=[],
+        remote_port=1235,
+        listen_port=1234,
+        request_tracker_max_size=2,
+    ) as paired_transmitter_a, _get_paired_transmitter(
+        local_port=1235, remote_port=1234, exposed_commands=mainfest_b
+    ):
+        request_ids = [
+            paired_transmitter_a.request_with_delayed_reply(
+                "add_numbers", params={"a": 1, "b": k}
+            )
+            for k in range(3)
+        ]
+
+        stats = paired_transmitter_a.get_request_tracker_stats()
+        assert stats.tracked == 2
+        assert stats.evicted_over_max_size == 1
+        assert paired_transmitter_a.check_for_reply(request_ids[0]) == (False, None)
+
+
+@pytest.mark.parametrize(
+    "batch_max_count, batch_max_bytes, expected_batch_sizes",
+    [(4, 1024 * 1024, [4, 4, 2]), (100, 1, [1] * 10), (100, 1024 * 1024, [10])],
+)
+def test_collect_batch(
+    batch_max_count: int, batch_max_bytes: int, expected_batch_sizes: List[int]
+) -> None:
+    paired_transmitter = PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=[],
+        batch_max_count=batch_max_count,
+        batch_max_bytes=batch_max_bytes,
+    )
+    for k in range(10):
+        paired_transmitter.reply_to_command(request_id=f"{k}", payload=k)
+
+    batch_sizes: List[int] = []
+    while not paired_transmitter._out_queue.empty():
+        message = paired_transmitter._out_queue.get()
+        assert message
+        frames, stop_requested = paired_transmitter._collect_batch(message.to_bytes())
+        assert stop_requested is False
+        batch_sizes.append(len(frames))
+
+    assert batch_sizes == expected_batch_sizes
+
+
+def test_collect_batch_stop_requested() -> None:
+    paired_transmitter = PairedTransmitter(
+        remote_host="localhost", exposed_commands=[], batch_max_count=10
+    )
+    paired_transmitter._out_queue.put(None)
+
+    frames, stop_requested = paired_transmitter._collect_batch(b"frame")
+    assert frames == [b"frame"]
+    assert stop_requested is True
+
+
+def test_batched_requests(mainfest_b: List[CommandManifest]) -> None:
+    batching = dict(batch_max_count=50, batch_linger=0.001)
+    with PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=[],
+        remote_port=1235,
+        listen_port=1234,
+        **batching,  # type: ignore
+    ) as paired_transmitter_a, PairedTransmitter(
+        remote_host="localhost",
+        exposed_commands=mainfest_b,
+        remote_port=1234,
+        listen_port=1235,
+        **batching,  # type: ignore
+    ) as paired_transmitter_b:
+        request_ids: List[str] = []
+
+        def _request(k: int) -> None:
+            request_ids.append(
+                paired_transmitter_a.request_with_delayed_reply(
+                    "add_numbers", params={"a": k, "b": k}
+                )
+            )
+
+        threads = [Thread(target=_request, args=(k,), daemon=True) for k in range(20)]
+        for thread in threads:
+            thread.start()
+
+        replied = 0
+        while replied < len(threads):
+            for command in paired_transmitter_b.get_incoming_requests():
+                paired_transmitter_b.reply_to_command(
+                    request_id=command.request_id, payload=sum(command.params.values())
+                )
+                replied += 1
+
+        for thread in threads:
+            thread.join()
+        time.sleep(WAIT_FOR_DELIVERY)
+
+        results = {paired_transmitter_a.check_for_reply(x)[1] for x in request_ids}
+        assert results == {2 * k for k in range(20)}
+
+
+def test_batch_max_count_validation() -> None:
+    with pytest.raises(ValueError):
+        PairedTransmitter(
+            remote_host="localhost", exposed_commands=[], batch_max_count=0
+        )
+
+
+def test_large_array_payloads(
+    paired_transmitter_a: PairedTransmitter, paired_transmitter_b: PairedTransmitter
+) -> None:
+    np = pytest.importorskip("numpy")
+    field = np.random.rand(1000, 1000)
+
+    def _worker_b() -> None:
+        while True:
+            for command in paired_transmitter_b.get_incoming_requests():
+                paired_transmitter_b.reply_to_command(
+                    request_id=command.request_id, payload={"field": field}
+                )
+                return
+            time.sleep(0.01)
+
+    thread = Thread(target=_worker_b, daemon=True)
+    thread.start()
+
+    reply = paired_transmitter_a.request_with_immediate_reply(
+        "get_random", timeout=5.0
+    )
+    thread.join()
+
+    assert reply is not None
+    assert np.array_equal(reply["field"], field)
@@ -1,4 +1,5 @@
 import json
+import time
 from typing import Any
 from typing import Dict
 from typing import List
@@ -14,6 +15,17 @@ from osparc_control.models import CommandReceived
 from osparc_control.models import CommandReply
 from osparc_control.models import CommandRequest
 from osparc_control.models import CommandType
+from osparc_control.models import decode_message
+from osparc_control.models import ENVELOPE_HEADER_SIZE
+from osparc_control.models import ENVELOPE_MARKER
+from osparc_control.models import ENVELOPE_VERSION
+from osparc_control.models import Message
+from osparc_control.models import MessageKind
+from osparc_control.models import pack_batch
+from osparc_control.models import RequestsTracker
+from osparc_control.models import RequestsTrackerStats
+from osparc_control.models import TrackedRequest
+from osparc_control.models import unpack_batch
 
 
 @pytest.fixture
@@ -83,9 +95,9 @@ def test_msgpack_serialization_deserialization(
 
     assert command_request == CommandRequest.from_bytes(command_request.to_bytes())
 
-    assert command_request.to_bytes() == umsgpack.packb(
-        json.loads(command_request.json())
-    )
+    assert command_request.to_bytes() == bytes(
+        (ENVELOPE_MARKER, ENVELOPE_VERSION, MessageKind.COMMAND_REQUEST)
+    ) + umsgpack.packb(json.loads(command_request.json()))
 
 
 @pytest.mark.parametrize("payload", [None, "a_string", 1, 1.0, b"some_bytes"])
@@ -126,3 +138,124 @@ def test_duplicate_command_parameter_name_in_manifest() -> None:
             ],
             command_type=CommandType.WITH_DELAYED_REPLY,
         )
+
+
+MESSAGES: List[Message] = [
+    CommandRequest(
+        request_id="unique_id",
+        action="test",
+        command_type=CommandType.WITH_DELAYED_REPLY,
+        params={"a": 1},
+    ),
+    CommandReceived(request_id="unique_id", accepted=True, error_message=None),
+    CommandReceived(request_id="unique_id", accepted=False, error_message="error"),
+    CommandReply(reply_id="unique_id", payload={"some": "data"}),
+]
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_decode_message(message: Message) -> None:
+    assert decode_message(message.to_bytes()) == message
+
+
+@pytest.mark.parametrize("message", MESSAGES)
+def test_decode_message_from_legacy_frame(message: Message) -> None:
+    legacy_frame = umsgpack.packb(message.dict())
+    assert decode_message(legacy_frame) == message
+    assert type(message).from_bytes(legacy_frame) == message
+
+
+def test_decode_message_unknown_envelope() -> None:
+    body = MESSAGES[0].to_bytes()[ENVELOPE_HEADER_SIZE:]
+
+    unknown_kind = bytes((ENVELOPE_MARKER, ENVELOPE_VERSION, 255)) + body
+    assert decode_message(unknown_kind) is None
+
+    unknown_version = (
+        bytes((ENVELOPE_MARKER, ENVELOPE_VERSION + 1, MessageKind.COMMAND_REQUEST))
+        + body
+    )
+    assert decode_message(unknown_version) is None
+
+
+def test_decode_message_not_recognized() -> None:
+    assert decode_message(umsgpack.packb({"not": "a message"})) is None
+
+
+def test_decode_message_invalid_content() -> None:
+    invalid_request = bytes(
+        (ENVELOPE_MARKER, ENVELOPE_VERSION, MessageKind.COMMAND_REQUEST)
+    ) + umsgpack.packb({"not": "a request"})
+    with pytest.raises(ValidationError):
+        decode_message(invalid_request)
+
+
+def _get_tracked_request(request_id: str) -> TrackedRequest:
+    return TrackedRequest(
+        request=CommandRequest(
+            request_id=request_id,
+            action="test",
+            command_type=CommandType.WITH_DELAYED_REPLY,
+        )
+    )
+
+
+def test_requests_tracker() -> None:
+    requests_tracker = RequestsTracker()
+    tracked_request = _get_tracked_request("a")
+
+    requests_tracker.add(tracked_request)
+    assert len(requests_tracker) == 1
+    assert requests_tracker.get("a") == tracked_request
+    assert requests_tracker.pop("a") == tracked_request
+    assert requests_tracker.get("a") is None
+    assert requests_tracker.pop("a") is None
+    assert requests_tracker.get_stats() == RequestsTrackerStats(
+        tracked=0, evicted_expired=0, evicted_over_max_size=0
+    )
+
+
+def test_requests_tracker_max_size() -> None:
+    requests_tracker = RequestsTracker(max_size=2)
+    for request_id in ["a", "b", "c"]:
+        requests_tracker.add(_get_tracked_request(request_id))
+
+    assert requests_tracker.get("a") is None
+    assert requests_tracker.get("b")
+    assert requests_tracker.get("c")
+    assert requests_tracker.get_stats() == RequestsTrackerStats(
+        tracked=2, evicted_expired=0, evicted_over_max_size=1
+    )
+
+
+def test_requests_tracker_ttl() -> None:
+    requests_tracker = RequestsTracker(ttl=0.1)
+    requests_tracker.add(_get_tracked_request("a"))
+    requests_tracker.add(_get_tracked_request("b"))
+    time.sleep(0.15)
+    requests_tracker.add(_get_tracked_request("c"))
+
+    assert requests_tracker.get("a") is None
+    assert requests_tracker.get("b") is None
+    assert requests_tracker.get("c")
+    assert requests_tracker.get_stats() == RequestsTrackerStats(
+        tracked=1, evicted_expired=2, evicted_over_max_size=0
+    )
+
+
+@pytest.mark.parametrize("max_size, ttl", [(0, None), (None, 0)])
+def test_requests_tracker_invalid_limits(
+    max_size: Optional[int], ttl: Optional[float]
+) -> None:
+    with pytest.raises(ValueError):
+        RequestsTracker(max_size=max_size, ttl=ttl)
+
+
+def test_pack_unpack_batch() -> None:
+    frames = [x.to_bytes() for x in MESSAGES]
+    batch = pack_batch(frames)
+    assert decode_message(batch) is None
+    assert unpack_batch(batch) == frames
+    assert [decode_message(x) for x in unpack_batch(batch)] == MESSAGES
+
+    assert unpack_batch(frames[0]) == [frames[0]]
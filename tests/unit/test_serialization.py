@@ -0,0 +1,181 @@
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import List
+
+import pytest
+from _pytest.fixtures import SubRequest
+
+from osparc_control.models import CommandReceived
+from osparc_control.models import CommandReply
+from osparc_control.models import CommandRequest
+from osparc_control.models import CommandType
+from osparc_control.models import decode_message
+from osparc_control.models import decode_message_frames
+from osparc_control.models import Message
+from osparc_control.serialization import AVAILABLE_CODECS
+from osparc_control.serialization import get_codec
+from osparc_control.serialization import packb
+from osparc_control.serialization import packb_frames
+from osparc_control.serialization import set_codec
+from osparc_control.serialization import unpackb
+from osparc_control.serialization import unpackb_frames
+
+np = pytest.importorskip("numpy")
+
+MESSAGES_FIELDS: List[Dict[str, Any]] = [
+    dict(
+        request_id="unique_id",
+        action="set_field",
+        params={"a": 1, "b": [1.5, "text", None, True], "c": {"nested": b"bytes"}},
+        command_type=CommandType.WITH_DELAYED_REPLY,
+    ),
+    dict(request_id="unique_id", accepted=False, error_message="refused"),
+    dict(reply_id="unique_id", payload={1: "int keys", "tuple": (1, 2)}),
+]
+
+# FIXTURES
+
+
+@pytest.fixture(autouse=True, params=list(AVAILABLE_CODECS))
+def codec_name(request: SubRequest) -> Iterable[str]:
+    previous = get_codec().name
+    set_codec(request.param)
+    yield request.param
+    set_codec(previous)
+
+
+# TESTS
+
+
+@pytest.mark.parametrize(
+    "array",
+    [
+        np.arange(10, dtype=np.int32),
+        np.zeros((3, 4, 5), dtype=np.float32),
+        np.random.rand(100, 100),
+        np.array([True, False]),
+        np.array([], dtype=np.uint8),
+        np.array([1 + 2j], dtype=np.complex128),
+        np.arange(20, dtype=">i8").reshape(4, 5),
+        np.asfortranarray(np.arange(12).reshape(3, 4)),
+        np.arange(20)[::3],
+        np.array(1.5),
+    ],
+)
+def test_ndarray_round_trip(array: Any) -> None:
+    decoded = unpackb(packb(array))
+    assert isinstance(decoded, np.ndarray)
+    assert decoded.dtype == array.dtype
+    assert decoded.shape == array.shape
+    assert np.array_equal(decoded, array)
+
+
+@pytest.mark.parametrize("scalar", [np.int64(3), np.uint8(255), np.bool_(True)])
+def test_numpy_scalar_round_trip(scalar: Any) -> None:
+    decoded = unpackb(packb(scalar))
+    assert type(decoded) is type(scalar)
+    assert decoded == scalar
+
+
+def test_ndarray_nested_in_containers() -> None:
+    data = {"field": np.ones((2, 2)), "others": [np.arange(3), "text", 1]}
+    decoded = unpackb(packb(data))
+    assert np.array_equal(decoded["field"], data["field"])
+    assert np.array_equal(decoded["others"][0], data["others"][0])
+    assert decoded["others"][1:] == ["text", 1]
+
+
+def test_ndarray_with_object_dtype_is_refused() -> None:
+    with pytest.raises(TypeError):
+        packb(np.array([{}, None], dtype=object))
+
+
+def test_decoded_ndarray_is_read_only() -> None:
+    decoded = unpackb(packb(np.arange(3)))
+    assert decoded.flags.writeable is False
+    assert decoded.copy().flags.writeable is True
+
+
+def test_messages_carry_ndarrays() -> None:
+    field = np.random.rand(50, 20)
+
+    request = CommandRequest(
+        request_id="unique_id",
+        action="set_field",
+        params={"field": field},
+        command_type=CommandType.WITHOUT_REPLY,
+    )
+    decoded_request = decode_message(request.to_bytes())
+    assert isinstance(decoded_request, CommandRequest)
+    assert np.array_equal(decoded_request.params["field"], field)
+
+    reply = CommandReply(reply_id="unique_id", payload=field)
+    decoded_reply = CommandReply.from_bytes(reply.to_bytes())
+    assert isinstance(decoded_reply, CommandReply)
+    assert np.array_equal(decoded_reply.payload, field)
+
+
+def test_packb_frames_moves_large_buffers_out_of_band() -> None:
+    large = np.random.rand(200, 100)
+    non_contiguous = np.arange(100_000)[::2]
+    data = {
+        "large": large,
+        "non_contiguous": non_contiguous,
+        "small": np.arange(3),
+        "blob": [b"x" * 100_000],
+        "small_blob": b"some_bytes",
+        "text": "not a buffer",
+    }
+
+    frames = packb_frames(data)
+    assert len(frames) == 4
+    # sent without being copied
+    assert isinstance(frames[1], memoryview)
+    assert np.shares_memory(np.asarray(frames[1]), large)
+
+    decoded = unpackb_frames(frames)
+    for key in ("large", "non_contiguous", "small"):
+        assert np.array_equal(decoded[key], data[key])
+    assert decoded["blob"] == data["blob"]
+    assert decoded["small_blob"] == b"some_bytes"
+    assert decoded["text"] == "not a buffer"
+
+
+def test_packb_frames_without_buffers_is_packb() -> None:
+    data = {"small": np.arange(3), "value": 1}
+    assert packb_frames(data) == [packb(data)]
+
+
+def test_messages_to_frames() -> None:
+    field = np.random.rand(500, 20)
+    reply = CommandReply(reply_id="unique_id", payload={"field": field})
+
+    frames = reply.to_frames()
+    assert len(frames) == 2
+
+    decoded_reply = decode_message_frames(frames)
+    assert isinstance(decoded_reply, CommandReply)
+    assert np.array_equal(decoded_reply.payload["field"], field)
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        CommandRequest(**MESSAGES_FIELDS[0]),
+        CommandReceived(**MESSAGES_FIELDS[1]),
+        CommandReply(**MESSAGES_FIELDS[2]),
+    ],
+)
+def test_codecs_are_interchangeable(message: Message, codec_name: str) -> None:
+    encoded = message.to_bytes()
+    for other_codec_name in AVAILABLE_CODECS:
+        set_codec(other_codec_name)
+        assert message.to_bytes() == encoded
+        assert decode_message(encoded) == decode_message(message.to_bytes())
+    set_codec(codec_name)
+
+
+def test_set_codec_unknown() -> None:
+    with pytest.raises(ValueError):
+        set_codec("unknown_codec")
@@ -1,3 +1,5 @@
+import time
+from threading import Thread
 from typing import Iterable
 from typing import Optional
 from typing import Type
@@ -78,3 +80,46 @@ def test_receive_nothing(sender_receiver_pair: SenderReceiverPair) -> None:
 def test_receive_returns_none_if_no_message_available() -> None:
     receiver = InMemoryTransport("B", "A")
     assert receiver.receive_bytes() is None
+
+
+def test_wait_for_messages(sender_receiver_pair: SenderReceiverPair) -> None:
+    assert sender_receiver_pair.wait_for_messages(timeout=0.01) is False
+
+    sender_receiver_pair.send_bytes(b"test")
+    assert sender_receiver_pair.wait_for_messages(timeout=1.0) is True
+    assert sender_receiver_pair.receive_bytes() == b"test"
+
+
+def test_wakeup_receiver_interrupts_wait(
+    sender_receiver_pair: SenderReceiverPair,
+) -> None:
+    def _wakeup() -> None:
+        time.sleep(0.1)
+        sender_receiver_pair.wakeup_receiver()
+
+    thread = Thread(target=_wakeup, daemon=True)
+    thread.start()
+
+    start = time.time()
+    assert sender_receiver_pair.wait_for_messages(timeout=10.0) is False
+    assert time.time() - start < 5.0
+
+    thread.join()
+
+
+def test_send_receive_frames(sender_receiver_pair: SenderReceiverPair) -> None:
+    if not sender_receiver_pair.supports_frames:
+        sender_receiver_pair.send_bytes(b"single")
+        assert sender_receiver_pair.wait_for_messages(timeout=1.0) is True
+        assert sender_receiver_pair.receive_frames() == [b"single"]
+        return
+
+    large_buffer = memoryview(bytes(range(256)) * 1024)
+    sender_receiver_pair.send_frames([b"header", large_buffer])
+    assert sender_receiver_pair.wait_for_messages(timeout=1.0) is True
+
+    frames = sender_receiver_pair.receive_frames()
+    assert frames is not None
+    assert frames[0] == b"header"
+    assert isinstance(frames[1], memoryview)
+    assert frames[1] == large_buffer